@@ -1,16 +1,20 @@
 import os
 import sqlite3
 import tempfile
+import threading
+import unicodedata
 import unittest
 from datetime import datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
 
 from ticketbot.database import (
+    SCHEMA_VERSION,
     STATUS_APPROVED,
     STATUS_CANCELLED,
     STATUS_PENDING,
     STATUS_REJECTED,
     Database,
+    _EVENT_STATS_BACKFILL_SQL,
 )
 
 BUDAPEST_TZ = ZoneInfo("Europe/Budapest")
@@ -131,6 +135,18 @@ class DatabaseTests(unittest.TestCase):
         self.assertEqual(quote["breakdown"][1]["count"], 2)
         self.assertAlmostEqual(quote["total_price"], 12200.0)
 
+        self.db.create_pending_reservation(
+            user_id=self.user_id,
+            event_id=event_id,
+            boys=2,
+            girls=0,
+            attendees=["A One", "B Two"],
+            payment_file_id="proof",
+            payment_file_type="photo",
+        )
+        requote = self.db.quote_booking(event_id=event_id, boys=2, girls=1)
+        self.assertEqual([row["tier_key"] for row in requote["breakdown"]], ["tier1", "tier2"])
+
     def test_quote_booking_applies_group_offer_discount(self):
         event_id = self._create_event(early_qty=10, t1_qty=0, t2_qty=0)
         ok, message = self.db.set_event_fields(
@@ -186,6 +202,7 @@ class DatabaseTests(unittest.TestCase):
         )
         self.assertTrue(ok)
         self.assertEqual(updated.status, STATUS_REJECTED)
+        self.assertEqual(updated, self.db.get_reservation(reservation.id))
 
         event_after = self.db.get_event(event_id)
         self.assertEqual(event_after.early_bird_qty, 2)
@@ -212,6 +229,7 @@ class DatabaseTests(unittest.TestCase):
         self.assertTrue(ok_add)
         self.assertEqual(updated.quantity, 2)
         self.assertAlmostEqual(updated.total_price, 6000.0)
+        self.assertEqual(updated, self.db.get_reservation(reservation.id))
         attendees = self.db.list_attendees(reservation.id)
         self.assertEqual([a["ticket_tier"] for a in attendees], ["early", "tier1"])
 
@@ -354,6 +372,7 @@ class DatabaseTests(unittest.TestCase):
         self.assertEqual(updated.discount_count, 1)
         self.assertEqual(updated.discount_amount, 1000.0)
         self.assertEqual(updated.total_price, 4000.0)
+        self.assertEqual(updated, self.db.get_reservation(reservation.id))
 
     def test_admin_add_guest_keeps_existing_discount_snapshot(self):
         event_id = self._create_event(early_qty=10, t1_qty=0, t2_qty=0)
@@ -490,6 +509,7 @@ class DatabaseTests(unittest.TestCase):
         ok, _msg, cancelled = self.db.cancel_reservation_for_user(self.user_id, reservation.code)
         self.assertTrue(ok)
         self.assertEqual(cancelled.status, STATUS_CANCELLED)
+        self.assertEqual(cancelled, self.db.get_reservation(reservation.id))
 
         event_after = self.db.get_event(event_id)
         self.assertEqual(event_after.early_bird_qty, 4)
@@ -541,6 +561,55 @@ class DatabaseTests(unittest.TestCase):
         self.assertAlmostEqual(float(row["approved_revenue"]), 5000.0)
         self.assertAlmostEqual(float(row["pending_revenue"]), 2600.0)
 
+        self.assertIsNot(self.db.list_event_stats(sort_by="approved"), rows)
+        self.db.create_pending_reservation(
+            user_id=self.user_id,
+            event_id=event_id,
+            boys=1,
+            girls=0,
+            attendees=["Late Buyer"],
+            payment_file_id="proof",
+            payment_file_type="photo",
+        )
+        refreshed = next(r for r in self.db.list_event_stats(sort_by="approved") if r["id"] == event_id)
+        self.assertEqual(refreshed["pending_tickets"], 2)
+
+    def test_event_stats_counters_follow_reservation_changes(self):
+        event_id = self._create_event(early_qty=10, t1_qty=0, t2_qty=0)
+        first = self.db.create_pending_reservation(
+            user_id=self.user_id,
+            event_id=event_id,
+            boys=1,
+            girls=1,
+            attendees=["Boy One", "Girl One"],
+            payment_file_id="proof",
+            payment_file_type="photo",
+        )
+        second = self.db.create_pending_reservation(
+            user_id=self.user_id,
+            event_id=event_id,
+            boys=1,
+            girls=0,
+            attendees=["Boy Two"],
+            payment_file_id="proof",
+            payment_file_type="photo",
+        )
+        self.db.approve_reservation(first.id, admin_tg_id=999)
+        self.db.reject_reservation(second.id, admin_tg_id=999, admin_note="No proof")
+        self.db.admin_add_guest_by_event(7164876915, event_id, "Bela", "Nagy", "boy")
+        guest = next(row for row in self.db.list_guests() if row["full_name"] == "Girl One")
+        self.db.admin_remove_guest(guest["attendee_id"])
+
+        counters = self.db.conn.execute("SELECT * FROM event_stats WHERE event_id = ?", (event_id,)).fetchone()
+        self.db.conn.execute("DELETE FROM event_stats")
+        self.db.conn.execute(_EVENT_STATS_BACKFILL_SQL)
+        recomputed = self.db.conn.execute("SELECT * FROM event_stats WHERE event_id = ?", (event_id,)).fetchone()
+        self.db.conn.commit()
+        self.assertEqual(tuple(counters), tuple(recomputed))
+
+        self.db.delete_event(event_id)
+        self.assertIsNone(self.db.conn.execute("SELECT 1 FROM event_stats WHERE event_id = ?", (event_id,)).fetchone())
+
     def test_search_reservations_matches_code_event_and_buyer(self):
         event_id = self._create_event(early_qty=6, t1_qty=0, t2_qty=0)
         reservation = self.db.create_pending_reservation(
@@ -562,6 +631,76 @@ class DatabaseTests(unittest.TestCase):
         by_name = self.db.search_reservations("test", sort_by="status", limit=10)
         self.assertTrue(any(r["code"] == reservation.code for r in by_name))
 
+        by_full_code = self.db.search_reservations(reservation.code.lower(), sort_by="newest", limit=10)
+        self.assertEqual([r["code"] for r in by_full_code], [reservation.code])
+
+        self.assertEqual(self.db.search_reservations("%", sort_by="newest", limit=10), [])
+
+        everything = self.db.search_reservations("   ", sort_by="newest", limit=10)
+        self.assertEqual([r["code"] for r in everything], [reservation.code])
+
+        self.db.upsert_user(987654, "Other", "Buyer", "000")
+        other = self.db.create_pending_reservation(
+            user_id=self.db.get_user(987654).id,
+            event_id=event_id,
+            boys=1,
+            girls=0,
+            attendees=["Other Buyer"],
+            payment_file_id="proof",
+            payment_file_type="photo",
+        )
+        by_tg_id = self.db.search_reservations("987654", sort_by="newest", limit=10)
+        self.assertEqual([r["code"] for r in by_tg_id], [other.code])
+
+        self.db.set_event_fields(event_id, {"title": "Renamed Gala"})
+        self.db.upsert_user(987654, "Zsofia", "Buyer", "000")
+        by_new_title = self.db.search_reservations("gala", sort_by="newest", limit=10)
+        self.assertEqual(sorted(r["code"] for r in by_new_title), sorted([reservation.code, other.code]))
+        by_new_name = self.db.search_reservations("zsof", sort_by="newest", limit=10)
+        self.assertEqual([r["code"] for r in by_new_name], [other.code])
+
+    def test_reservation_search_index_backfills_and_tracks_deletes(self):
+        event_id = self._create_event(early_qty=6, t1_qty=0, t2_qty=0)
+        reservation = self.db.create_pending_reservation(
+            user_id=self.user_id,
+            event_id=event_id,
+            boys=1,
+            girls=0,
+            attendees=["Find Me"],
+            payment_file_id="proof",
+            payment_file_type="photo",
+        )
+        self.assertEqual([r["code"] for r in self.db.search_reservations("sample", limit=10)], [reservation.code])
+
+        self.db.conn.execute("DELETE FROM reservation_search")
+        self.db.conn.execute("PRAGMA user_version = 5")
+        self.db.conn.commit()
+        self.assertEqual(self.db.search_reservations("sample", limit=10), [])
+        self.assertEqual([r["code"] for r in self.db.search_reservations("sa", limit=10)], [reservation.code])
+
+        reopened = Database(self.db_path)
+        self.assertEqual([r["code"] for r in reopened.search_reservations("sample", limit=10)], [reservation.code])
+
+        reopened.delete_event(event_id)
+        self.assertEqual(reopened.search_reservations("sample", limit=10), [])
+        self.assertEqual(reopened.conn.execute("SELECT COUNT(*) FROM reservation_search").fetchone()[0], 0)
+
+    def test_export_event_csv_streams_raw_tuples(self):
+        event_id = self._create_event(early_qty=6, t1_qty=0, t2_qty=0)
+        reservation = self.db.create_pending_reservation(
+            user_id=self.user_id,
+            event_id=event_id,
+            boys=1,
+            girls=1,
+            attendees=["Boy One", "Girl One"],
+            payment_file_id="proof",
+            payment_file_type="photo",
+        )
+
+        rows = list(self.db.export_event_csv(event_id))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0][:5], (reservation.code, reservation.ticket_type, 1, 1, 2))
+
     def test_admin_guest_add_remove_rename_and_list(self):
         event_id = self._create_event(early_qty=5, t1_qty=0, t2_qty=0)
         reservation = self.db.create_pending_reservation(
@@ -625,6 +764,7 @@ class DatabaseTests(unittest.TestCase):
         self.assertEqual(updated.status, STATUS_CANCELLED)
         self.assertEqual(updated.quantity, 0)
         self.assertEqual(len(self.db.list_attendees(reservation.id)), 0)
+        self.assertEqual(updated, self.db.get_reservation(reservation.id))
 
     def test_admin_remove_guest_last_rejected_attendee_hard_deletes_reservation(self):
         event_id = self._create_event(early_qty=3, t1_qty=0, t2_qty=0)
@@ -735,6 +875,62 @@ class DatabaseTests(unittest.TestCase):
         self.assertEqual(event.boys_group_offer_enabled, 0)
         self.assertEqual(event.event_datetime, new_dt)
 
+    def test_list_reservations_with_attendees_groups_rows_per_reservation(self):
+        event_id = self._create_event(early_qty=10, t1_qty=0, t2_qty=0)
+        first = self.db.create_pending_reservation(
+            user_id=self.user_id,
+            event_id=event_id,
+            boys=2,
+            girls=0,
+            attendees=["A One", "B Two"],
+            payment_file_id="proof",
+            payment_file_type="photo",
+        )
+        second = self.db.create_pending_reservation(
+            user_id=self.user_id,
+            event_id=event_id,
+            boys=0,
+            girls=1,
+            attendees=["C Three"],
+            payment_file_id="proof",
+            payment_file_type="photo",
+        )
+
+        items = self.db.list_reservations_with_attendees(self.user_id)
+        self.assertEqual([reservation.code for reservation, _ in items], [second.code, first.code])
+        self.assertEqual(items[0][0], second)
+        self.assertEqual([a["full_name"] for a in items[0][1]], ["C Three"])
+        self.assertEqual([a["full_name"] for a in items[1][1]], ["A One", "B Two"])
+        self.assertEqual(items[1][1][0]["ticket_tier"], "early")
+        self.assertEqual(self.db.list_reservations_with_attendees(self.user_id + 1000), [])
+
+        tickets = self.db.list_user_tickets(self.user_id, 1)
+        self.assertEqual(len(tickets), 1)
+        self.assertEqual(tickets[0][0], second)
+        self.assertEqual(tickets[0][2], ["C Three"])
+        self.assertEqual(self.db.get_event(event_id).title, tickets[0][1])
+        self.assertEqual(self.db.list_user_tickets(self.user_id + 1000, 20), [])
+
+    def test_ensure_user_for_tg_reuses_existing_profile(self):
+        cursor = self.db.conn.cursor()
+        self.assertEqual(self.db._ensure_user_for_tg(123, cursor), self.user_id)
+        admin_id = self.db._ensure_user_for_tg(999, cursor)
+        self.assertEqual(self.db._ensure_user_for_tg(999, cursor), admin_id)
+        self.db.conn.commit()
+
+        self.assertEqual(self.db.get_user(123).name, "Test")
+        admin = self.db.get_user(999)
+        self.assertEqual(admin.id, admin_id)
+        self.assertEqual((admin.name, admin.surname), ("Admin", "User"))
+
+    def test_parse_event_datetime_matches_strptime_format(self):
+        parsed = self.db.parse_event_datetime("2026-03-03 16:05")
+        self.assertEqual(parsed, datetime(2026, 3, 3, 16, 5, tzinfo=BUDAPEST_TZ))
+        self.assertEqual(self.db.parse_event_datetime("2026-3-3 16:05"), parsed)
+        for value in ("2026-13-03 16:00", "2026-02-30 10:00", "03.03.2026 16:00", ""):
+            with self.assertRaises(ValueError):
+                self.db.parse_event_datetime(value)
+
     def test_admin_add_guest_by_event_and_remove_by_name(self):
         event_id = self._create_event(early_qty=2, t1_qty=0, t2_qty=0)
 
@@ -768,6 +964,193 @@ class DatabaseTests(unittest.TestCase):
         event_after_remove = self.db.get_event(event_id)
         self.assertEqual(event_after_remove.early_bird_qty, 2)
 
+    def test_connection_pragmas_are_applied(self):
+        self.assertEqual(self.db.conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        self.assertEqual(self.db.conn.execute("PRAGMA synchronous").fetchone()[0], 1)
+        self.assertEqual(self.db.conn.execute("PRAGMA busy_timeout").fetchone()[0], 5000)
+        self.assertEqual(self.db.conn.execute("PRAGMA foreign_keys").fetchone()[0], 1)
+        self.assertEqual(self.db.conn.execute("PRAGMA mmap_size").fetchone()[0], 268435456)
+
+    def test_tier_hold_requires_write_transaction(self):
+        event_id = self._create_event(early_qty=2, t1_qty=0, t2_qty=0)
+        with self.assertRaises(RuntimeError):
+            self.db._apply_tier_hold(self.db.conn.cursor(), event_id, "early", 1)
+        errors = []
+
+        def hold_from_other_thread():
+            try:
+                self.db._apply_tier_hold(self.db.conn.cursor(), event_id, "early", 1)
+            except RuntimeError as exc:
+                errors.append(exc)
+
+        with self.db.batch_admin_ops():
+            self.assertTrue(self.db._apply_tier_hold(self.db.conn.cursor(), event_id, "early", 1))
+            other = threading.Thread(target=hold_from_other_thread)
+            other.start()
+            other.join()
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(self.db.get_event(event_id).early_bird_qty, 1)
+
+    def test_batch_admin_ops_commits_together_and_rolls_back_on_error(self):
+        event_id = self._create_event(early_qty=3, t1_qty=0, t2_qty=0)
+
+        with self.db.batch_admin_ops():
+            self.db.admin_import_guest_by_event(7164876915, event_id, "Anna", "Kovacs")
+            self.db.admin_add_guest_by_event(7164876915, event_id, "Bela", "Nagy", "boy")
+        self.assertEqual(len(self.db.list_guests()), 2)
+        self.assertEqual(self.db.get_event(event_id).early_bird_qty, 2)
+
+        with self.assertRaises(RuntimeError):
+            with self.db.batch_admin_ops():
+                self.db.admin_add_guest_by_event(7164876915, event_id, "Csaba", "Toth", "boy")
+                raise RuntimeError("abort import")
+        self.assertEqual(len(self.db.list_guests()), 2)
+        self.assertEqual(self.db.get_event(event_id).early_bird_qty, 2)
+
+    def test_other_threads_read_committed_state_during_write_transaction(self):
+        event_id = self._create_event(early_qty=3, t1_qty=0, t2_qty=0)
+        seen = []
+
+        with self.db.batch_admin_ops():
+            self.db._cursor().execute("UPDATE events SET title = 'Renamed' WHERE id = ?", (event_id,))
+            self.assertEqual(self.db.get_event(event_id).title, "Renamed")
+            reader = threading.Thread(target=lambda: seen.append(self.db.get_event(event_id).title))
+            reader.start()
+            reader.join()
+
+        self.assertEqual(seen, ["Sample Event"])
+        self.assertEqual(self.db.get_event(event_id).title, "Renamed")
+
+    def test_admin_import_guests_by_event_inserts_all_rows(self):
+        event_id = self._create_event(early_qty=3, t1_qty=0, t2_qty=0)
+
+        ok, _msg, imported = self.db.admin_import_guests_by_event(
+            7164876915,
+            event_id,
+            [("Anna", "Kovacs"), ("Bela", ""), ("Csaba", "Toth")],
+        )
+        self.assertTrue(ok)
+        self.assertEqual(imported, 3)
+        guests = self.db.list_guests()
+        self.assertEqual(sorted(row["full_name"] for row in guests), ["Anna Kovacs", "Bela", "Csaba Toth"])
+        self.assertEqual(len({row["reservation_code"] for row in guests}), 3)
+        self.assertEqual(self.db.get_event(event_id).early_bird_qty, 3)
+
+        ok_missing, _msg_missing, imported_missing = self.db.admin_import_guests_by_event(7164876915, 99999, [("A", "B")])
+        self.assertFalse(ok_missing)
+        self.assertEqual(imported_missing, 0)
+
+    def test_list_guests_pages_with_after_id(self):
+        event_id = self._create_event(early_qty=3, t1_qty=0, t2_qty=0)
+        self.db.admin_import_guests_by_event(
+            7164876915,
+            event_id,
+            [("Anna", "Kovacs"), ("Bela", "Nagy"), ("Csaba", "Toth")],
+        )
+
+        first_page = self.db.list_guests(limit=2)
+        self.assertEqual([row["full_name"] for row in first_page], ["Csaba Toth", "Bela Nagy"])
+        second_page = self.db.list_guests(limit=2, after_id=first_page[-1]["attendee_id"])
+        self.assertEqual([row["full_name"] for row in second_page], ["Anna Kovacs"])
+
+    def test_list_guests_pages_through_every_sort(self):
+        event_id = self._create_event(early_qty=5, t1_qty=0, t2_qty=0)
+        self.db.admin_import_guests_by_event(
+            7164876915,
+            event_id,
+            [("dan", "X"), ("Ann", "X"), ("Cat", "X"), ("Bob", "X"), ("ann", "X")],
+        )
+
+        for sort_by in ("newest", "name", "event", "reservation", "status"):
+            expected = [row["attendee_id"] for row in self.db.list_guests(sort_by=sort_by)]
+            paged = []
+            after_id = None
+            while True:
+                page = self.db.list_guests(sort_by=sort_by, limit=2, after_id=after_id)
+                if not page:
+                    break
+                paged.extend(row["attendee_id"] for row in page)
+                after_id = page[-1]["attendee_id"]
+            self.assertEqual(paged, expected, sort_by)
+
+    def test_list_active_reservations_pages_through_tied_timestamps(self):
+        event_id = self._create_event(early_qty=5, t1_qty=0, t2_qty=0)
+        for index in range(5):
+            self.db.create_pending_reservation(
+                user_id=self.user_id,
+                event_id=event_id,
+                boys=1,
+                girls=0,
+                attendees=[f"Guest{index} X"],
+                payment_file_id="proof",
+                payment_file_type="photo",
+            )
+        self.db.conn.execute("UPDATE reservations SET created_at = '2026-01-01T00:00:00+00:00'")
+        self.db.conn.commit()
+
+        expected = [row["reservation_id"] for row in self.db.list_active_reservations(limit=10)]
+        paged = []
+        page = self.db.list_active_reservations(limit=2)
+        while page:
+            paged.extend(row["reservation_id"] for row in page)
+            page = self.db.list_active_reservations(
+                limit=2,
+                created_before=page[-1]["created_at"],
+                before_id=page[-1]["reservation_id"],
+            )
+        self.assertEqual(len(expected), 5)
+        self.assertEqual(paged, expected)
+
+    def test_list_guests_search_is_literal_and_nfc_normalized(self):
+        event_id = self._create_event(early_qty=3, t1_qty=0, t2_qty=0)
+        self.db.admin_import_guests_by_event(
+            7164876915,
+            event_id,
+            [("Horváth", "Tamás"), ("Bela", "Nagy")],
+        )
+
+        self.assertEqual(self.db.list_guests(search="%"), [])
+        decomposed = unicodedata.normalize("NFD", "horváth")
+        self.assertEqual([row["full_name"] for row in self.db.list_guests(search=decomposed)], ["Horváth Tamás"])
+
+        self.db.upsert_user(555, "Müller", "Anna", "000")
+        reservation = self.db.create_pending_reservation(
+            user_id=self.db.get_user(555).id,
+            event_id=event_id,
+            boys=0,
+            girls=1,
+            attendees=["Anna Müller"],
+            payment_file_id="proof",
+            payment_file_type="photo",
+        )
+        for text in ("müller", "mü"):
+            found = self.db.search_reservations(unicodedata.normalize("NFD", text), limit=10)
+            self.assertEqual([row["code"] for row in found], [reservation.code], text)
+
+        self.assertEqual(self.db.list_active_reservations(search="%"), [])
+        self.assertEqual(self.db.list_active_reservations(search="_"), [])
+        active = self.db.list_active_reservations(search=unicodedata.normalize("NFD", "müll"))
+        self.assertEqual([row["reservation_code"] for row in active], [reservation.code])
+
+    def test_migration_normalizes_status_for_remove_by_name(self):
+        event_id = self._create_event(early_qty=2, t1_qty=0, t2_qty=0)
+        ok_add, _msg_add, reservation = self.db.admin_add_guest_by_event(
+            admin_tg_id=7164876915,
+            event_id=event_id,
+            name="Olzhas",
+            surname="Olzhasov",
+            gender_raw="boy",
+        )
+        self.assertTrue(ok_add)
+        self.db.conn.execute("UPDATE reservations SET status = ' Approved ' WHERE id = ?", (reservation.id,))
+        self.db.conn.execute("PRAGMA user_version = 1")
+        self.db.conn.commit()
+
+        reopened = Database(self.db_path)
+        self.assertEqual(reopened.get_reservation(reservation.id).status, STATUS_APPROVED)
+        ok_remove, _msg_remove, _updated = reopened.admin_remove_guest_by_name(event_id, "olzhas", "OLZHASOV")
+        self.assertTrue(ok_remove)
+
     def test_list_guest_name_pairs_splits_legacy_full_name(self):
         event_id = self._create_event(early_qty=3, t1_qty=0, t2_qty=0)
         self.db.create_pending_reservation(
@@ -781,6 +1164,17 @@ class DatabaseTests(unittest.TestCase):
         )
         pairs = self.db.list_guest_name_pairs()
         self.assertTrue(("Olzhas", "Olzhasov") in pairs)
+        self.assertEqual(list(self.db.iter_guest_name_pairs()), pairs)
+
+    def test_streamed_reads_do_not_pin_the_thread_reader(self):
+        event_id = self._create_event(early_qty=300, t1_qty=0, t2_qty=0)
+        self.db.admin_import_guests_by_event(7164876915, event_id, [(f"Name{i}", "Guest") for i in range(299)])
+
+        pairs = self.db.iter_guest_name_pairs()
+        next(pairs)
+        self.db.admin_import_guests_by_event(7164876915, event_id, [("Late", "Guest")])
+        self.assertIn(("Late", "Guest"), self.db.list_guest_name_pairs())
+        self.assertEqual(len(list(pairs)), 298)
 
     def test_migrates_legacy_schema_for_new_fields(self):
         legacy_path = os.path.join(self.temp_dir.name, "legacy.db")
@@ -834,6 +1228,15 @@ class DatabaseTests(unittest.TestCase):
         conn.close()
 
         migrated_db = Database(legacy_path)
+        self.assertEqual(migrated_db.conn.execute("PRAGMA user_version").fetchone()[0], SCHEMA_VERSION)
+        self.assertIsNotNone(
+            migrated_db.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_attendees_full_name_nocase'"
+            ).fetchone()
+        )
+        self.assertIsNotNone(
+            migrated_db.conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone()
+        )
         event_cols = migrated_db._table_columns("events")
         reservation_cols = migrated_db._table_columns("reservations")
         attendee_cols = migrated_db._table_columns("attendees")
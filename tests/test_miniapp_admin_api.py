@@ -1,15 +1,16 @@
+import csv
 import json
 import importlib
 import os
 import tempfile
 import time
 import unittest
-from io import BytesIO
+from io import BytesIO, StringIO
 from pathlib import Path
 from urllib.parse import urlparse
 
 from fastapi.testclient import TestClient
-from openpyxl import Workbook
+from openpyxl import Workbook, load_workbook
 
 
 class MiniAppAdminApiTests(unittest.TestCase):
@@ -27,6 +28,7 @@ class MiniAppAdminApiTests(unittest.TestCase):
             "UPLOAD_MAX_MB",
             "UPLOAD_RETENTION_DAYS",
             "UPLOAD_CLEANUP_INTERVAL_SECONDS",
+            "UPLOAD_ACCEL_REDIRECT_PREFIX",
         )
         self._env_backup = {key: os.environ.get(key) for key in self._env_keys}
         os.environ["DATABASE_PATH"] = self.db_path
@@ -360,6 +362,21 @@ class MiniAppAdminApiTests(unittest.TestCase):
         guests = guests_resp.json().get("items", [])
         self.assertTrue(any(item.get("full_name") == "Horváth Tamás" for item in guests))
 
+    def test_import_xlsx_rejects_oversized_upload(self):
+        wb = Workbook()
+        wb.active.append(["Big", "Upload"])
+        payload = BytesIO()
+        wb.save(payload)
+        self.server.MAX_XLSX_IMPORT_BYTES = len(payload.getvalue()) - 1
+
+        response = self.client.post(
+            "/api/admin/guest/import_xlsx",
+            data={"tg_id": str(self.admin_tg_id), "event_id": str(self.event_id)},
+            files={"file": ("big.xlsx", payload.getvalue(), "application/octet-stream")},
+        )
+        self.assertEqual(response.status_code, 413, response.text)
+        self.assertEqual(self.db.list_guest_name_pairs(), [])
+
     def test_admin_guests_without_limit_returns_all_rows(self):
         wb = Workbook()
         ws = wb.active
@@ -387,6 +404,7 @@ class MiniAppAdminApiTests(unittest.TestCase):
         self.assertEqual(import_resp.status_code, 200, import_resp.text)
         self.assertEqual(import_resp.json().get("added"), 45)
 
+        self.server.JSON_STREAM_ROWS_PER_CHUNK = 4
         all_resp = self.client.get(
             "/api/admin/guests",
             params={"tg_id": self.admin_tg_id},
@@ -401,6 +419,35 @@ class MiniAppAdminApiTests(unittest.TestCase):
         self.assertEqual(limited_resp.status_code, 200, limited_resp.text)
         self.assertEqual(len(limited_resp.json().get("items", [])), 10)
 
+    def test_export_xlsx_streams_guest_sheet(self):
+        self._create_reservation("Export Guest", status="approved")
+
+        resp = self.client.get("/api/admin/guest/export_xlsx", params={"tg_id": self.admin_tg_id})
+        self.assertEqual(resp.status_code, 200, resp.text)
+        workbook = load_workbook(filename=BytesIO(resp.content), read_only=True)
+        rows = list(workbook["Guests"].iter_rows(values_only=True))
+        self.assertEqual(rows[0], ("Name", "Surname"))
+        self.assertIn(("Export", "Guest"), rows[1:])
+
+    def test_export_event_csv_streams_reservations(self):
+        reservation = self._create_reservation("Csv Guest", status="approved")
+
+        resp = self.client.get(
+            f"/api/admin/event/{self.event_id}/export.csv",
+            params={"tg_id": self.admin_tg_id},
+        )
+        self.assertEqual(resp.status_code, 200, resp.text)
+        self.assertTrue(resp.headers["content-type"].startswith("text/csv"))
+        rows = list(csv.reader(StringIO(resp.text)))
+        self.assertEqual(rows[0][0], "Reservation code")
+        self.assertIn(reservation.code, [row[0] for row in rows[1:]])
+
+        missing = self.client.get(
+            "/api/admin/event/999999/export.csv",
+            params={"tg_id": self.admin_tg_id},
+        )
+        self.assertEqual(missing.status_code, 404)
+
     def test_admin_can_delete_event_with_related_reservations_and_attendees(self):
         reservation = self._create_reservation("Delete Me", status="approved")
         attendees_before = self.db.conn.execute("SELECT COUNT(*) FROM attendees").fetchone()[0]
@@ -449,6 +496,7 @@ class MiniAppAdminApiTests(unittest.TestCase):
         )
         self.assertEqual(response.status_code, 413, response.text)
         self.assertIn("Max allowed size", response.json().get("detail", ""))
+        self.assertEqual(os.listdir(self.server.UPLOAD_DIR), [])
 
     def test_book_with_payment_creates_pending_reservation_and_lists_ticket(self):
         self.db.set_event_fields(
@@ -516,6 +564,41 @@ class MiniAppAdminApiTests(unittest.TestCase):
         self.assertEqual(reservation_count, 0)
         self.assertEqual(len(list(Path(os.environ["UPLOAD_DIR"]).glob("*"))), 0)
 
+    def test_book_with_payment_names_upload_from_magic_bytes(self):
+        response = self._book_with_payment(
+            filename="proof.jpg",
+            content=b"\x89PNG\r\n\x1a\n" + b"png-body",
+            mime="image/jpeg",
+        )
+        self.assertEqual(response.status_code, 200, response.text)
+        reservation = self.db.get_reservation_by_code(response.json()["code"])
+        self.assertTrue(reservation.payment_file_id.endswith(".png"))
+
+        self.db.set_event_fields(self.event_id, {"repost_discount_enabled": 1, "repost_discount_amount": 500})
+        response = self._book_with_payment(
+            discounted_attendee_indexes=[0],
+            repost_files={0: ("repost.png", b"%PDF-1.7 disguised", "image/png")},
+        )
+        self.assertEqual(response.status_code, 400, response.text)
+        self.assertIn("Only image is accepted", response.json().get("detail", ""))
+
+    def test_book_with_payment_is_rate_limited_per_tg_id(self):
+        self.server.BOOKING_RATE_LIMIT_PER_MINUTE = 1
+        first = self._book_with_payment(attendees=["SingleNameOnly"])
+        self.assertEqual(first.status_code, 400, first.text)
+        second = self._book_with_payment()
+        self.assertEqual(second.status_code, 429, second.text)
+        other = self._book_with_payment(tg_id=999999999)
+        self.assertEqual(other.status_code, 404, other.text)
+        self.assertNotIn(("booking", 999999999), self.server._RATE_LIMIT_HITS)
+
+    def test_rate_limit_sweeps_expired_keys(self):
+        self.server.RATE_LIMIT_SWEEP_SIZE = 2
+        self.server._RATE_LIMIT_HITS[("booking", 1)].append(time.monotonic() - 120)
+        self.server._RATE_LIMIT_HITS[("booking", 2)].append(time.monotonic() - 120)
+        self.server._rate_limit("booking", 3, 5)
+        self.assertEqual(list(self.server._RATE_LIMIT_HITS), [("booking", 3)])
+
     def test_book_with_payment_rejects_attendee_name_without_surname(self):
         response = self._book_with_payment(
             attendees=["SingleNameOnly"],
@@ -766,6 +849,85 @@ class MiniAppAdminApiTests(unittest.TestCase):
         self.assertEqual(event_payload["prices"]["girls_group_offer_enabled"], 1)
         self.assertEqual(event_payload["prices"]["boys_group_offer_enabled"], 0)
 
+    def test_events_response_cache_is_refreshed_after_event_update(self):
+        first = self.client.get("/api/events")
+        self.assertEqual(first.status_code, 200, first.text)
+        self.assertIn("public", self.server._EVENTS_RESPONSE_CACHE)
+
+        self.db.set_event_fields(self.event_id, {"repost_discount_amount": 1250})
+        refreshed = self.client.get("/api/events").json()["items"]
+        payload = next(x for x in refreshed if x["id"] == self.event_id)
+        self.assertEqual(payload["repost_discount_amount"], 1250.0)
+
+    def test_events_etag_returns_not_modified(self):
+        first = self.client.get("/api/events")
+        self.assertEqual(first.status_code, 200, first.text)
+        etag = first.headers["etag"]
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertIn("max-age", first.headers["cache-control"])
+
+        cached = self.client.get("/api/events", headers={"If-None-Match": etag})
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.headers["etag"], etag)
+
+        self.db.set_event_fields(self.event_id, {"repost_discount_amount": 1250})
+        changed = self.client.get("/api/events", headers={"If-None-Match": etag})
+        self.assertEqual(changed.status_code, 200, changed.text)
+        self.assertNotEqual(changed.headers["etag"], etag)
+
+    def test_uploads_use_accel_redirect_when_prefix_is_set(self):
+        os.environ["UPLOAD_ACCEL_REDIRECT_PREFIX"] = "/_protected_uploads/"
+        server = importlib.reload(self.server)
+        with TestClient(server.app) as client:
+            resp = client.get("/uploads/proof.jpg")
+        self.assertEqual(resp.status_code, 200, resp.text)
+        self.assertEqual(resp.headers["x-accel-redirect"], "/_protected_uploads/proof.jpg")
+        self.assertEqual(resp.content, b"")
+
+    def test_html_pages_are_served_from_memory(self):
+        for path, content in (("/", self.server.INDEX_HTML), ("/admin", self.server.ADMIN_HTML)):
+            resp = self.client.get(path)
+            self.assertEqual(resp.status_code, 200, resp.text)
+            self.assertTrue(resp.headers["content-type"].startswith("text/html"))
+            self.assertEqual(resp.content, content)
+
+    def test_admin_bootstrap_etag_returns_not_modified(self):
+        first = self.client.get("/api/admin/bootstrap", params={"tg_id": self.admin_tg_id})
+        self.assertEqual(first.status_code, 200, first.text)
+        self.assertEqual(first.json(), {"ok": True, "tg_id": self.admin_tg_id})
+        self.assertTrue(first.headers["cache-control"].startswith("private"))
+
+        cached = self.client.get(
+            "/api/admin/bootstrap",
+            params={"tg_id": self.admin_tg_id},
+            headers={"If-None-Match": first.headers["etag"]},
+        )
+        self.assertEqual(cached.status_code, 304)
+
+        denied = self.client.get(
+            "/api/admin/bootstrap",
+            params={"tg_id": self.user_tg_id},
+            headers={"If-None-Match": first.headers["etag"]},
+        )
+        self.assertEqual(denied.status_code, 403)
+
+    def test_static_assets_cache_by_version(self):
+        versioned = self.client.get("/static/app.js", params={"v": "test"})
+        self.assertEqual(versioned.status_code, 200)
+        self.assertIn("immutable", versioned.headers["cache-control"])
+
+        plain = self.client.get("/static/app.js")
+        self.assertEqual(plain.status_code, 200)
+        self.assertEqual(plain.headers["cache-control"], "no-cache")
+
+    def test_large_responses_are_gzipped(self):
+        resp = self.client.get("/static/app.js", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.headers.get("content-encoding"), "gzip")
+
+        small = self.client.get("/api/admin/bootstrap", params={"tg_id": self.admin_tg_id})
+        self.assertNotIn("content-encoding", small.headers)
+
     def test_event_payment_url_requires_https(self):
         bad_create = self.client.post(
             "/api/admin/event/create_simple",
@@ -18,6 +18,7 @@ from telegram.ext import (
 
 from ticketbot.config import Config
 from ticketbot.database import (
+    EVENT_EXPORT_CSV_HEADERS,
     STATUS_APPROVED,
     STATUS_PENDING,
     Database,
@@ -2005,23 +2006,7 @@ class TelegramBot:
         rows = self.admin.export_event_csv(event_id)
         output = StringIO()
         writer = csv.writer(output)
-        writer.writerow(
-            [
-                "Reservation code",
-                "Ticket type",
-                "Boys",
-                "Girls",
-                "Quantity",
-                "Total price",
-                "Status",
-                "Payment file type",
-                "Payment file id",
-                "Admin note",
-                "Buyer name",
-                "Buyer surname",
-                "Buyer phone",
-            ]
-        )
+        writer.writerow(EVENT_EXPORT_CSV_HEADERS)
         writer.writerows(rows)
         output.seek(0)
         await update.message.reply_document(
@@ -1,13 +1,23 @@
-import os
+import json
+import re
+import secrets
 import sqlite3
-import uuid
+import threading
+import time
+import unicodedata
+from contextlib import contextmanager
+from dataclasses import fields
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from itertools import chain, groupby, product, repeat
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
 from zoneinfo import ZoneInfo
 
 from ticketbot.models import Event, Reservation, User
 
 EVENT_DT_FORMAT = "%Y-%m-%d %H:%M"
+EVENT_DT_PATTERN = re.compile(r"(\d{4})-(\d{2})-(\d{2}) (\d{2}):(\d{2})", re.ASCII)
+RESERVATION_CODE_PATTERN = re.compile(r"[ARI]\d+-[0-9A-F]{8}", re.ASCII)
 BUDAPEST_TZ = ZoneInfo("Europe/Budapest")
 
 STATUS_PENDING = "pending_payment_review"
@@ -15,23 +25,565 @@ STATUS_APPROVED = "approved"
 STATUS_REJECTED = "rejected"
 STATUS_CANCELLED = "cancelled"
 LEGACY_PENDING_STATUSES = {"pending"}
+ADMIN_MUTABLE_STATUSES = (
+    STATUS_PENDING,
+    STATUS_APPROVED,
+    STATUS_REJECTED,
+    *sorted(LEGACY_PENDING_STATUSES),
+    "pending_payment",
+    "pending_review",
+    "pending_payment_approval",
+)
+EVENT_EXPORT_CSV_HEADERS = (
+    "Reservation code",
+    "Ticket type",
+    "Boys",
+    "Girls",
+    "Quantity",
+    "Total price",
+    "Status",
+    "Payment file type",
+    "Payment file id",
+    "Admin note",
+    "Buyer name",
+    "Buyer surname",
+    "Buyer phone",
+)
+# Bump whenever _migrate_schema gains a new step so existing databases rerun it.
+SCHEMA_VERSION = 6
+
+_GENDER_MAP = {
+    "boy": "boy",
+    "male": "boy",
+    "m": "boy",
+    "girl": "girl",
+    "female": "girl",
+    "f": "girl",
+}
+
+_ATTENDEE_FIELDS = (
+    "id",
+    "reservation_id",
+    "name",
+    "surname",
+    "full_name",
+    "gender",
+    "repost_discount_applied",
+    "repost_proof_file_id",
+    "repost_proof_file_type",
+    "ticket_tier",
+    "status",
+)
+_EVENT_COLUMNS = tuple(field.name for field in fields(Event))
+_RESERVATION_COLUMNS = tuple(field.name for field in fields(Reservation))
+_USER_COLUMNS = tuple(field.name for field in fields(User))
+_RESERVATION_FIELD_COUNT = len(_RESERVATION_COLUMNS)
+_RESERVATION_RETURNING_COLUMNS = ", ".join(_RESERVATION_COLUMNS)
+_JOINED_EVENT_COLUMNS = ", ".join(f"e.{column}" for column in _EVENT_COLUMNS)
+
+_USER_SELECT = f"SELECT {', '.join(_USER_COLUMNS)} FROM users"
+_GET_USER_SQL = _USER_SELECT + " WHERE tg_id = ?"
+_GET_USER_BY_ID_SQL = _USER_SELECT + " WHERE id = ?"
+_LIST_BLOCKED_USERS_SQL = _USER_SELECT + " WHERE blocked = 1"
+_EVENT_SELECT = f"SELECT {', '.join(_EVENT_COLUMNS)} FROM events"
+_GET_EVENT_SQL = _EVENT_SELECT + " WHERE id = ?"
+_LIST_OPEN_EVENTS_SQL = _EVENT_SELECT + " WHERE status = 'open' ORDER BY event_datetime"
+_RESERVATION_SELECT = f"SELECT {_RESERVATION_RETURNING_COLUMNS} FROM reservations"
+_GET_RESERVATION_SQL = _RESERVATION_SELECT + " WHERE id = ?"
+_GET_RESERVATION_BY_CODE_SQL = _RESERVATION_SELECT + " WHERE code = ?"
+_LIST_USER_RESERVATIONS_SQL = _RESERVATION_SELECT + " WHERE user_id = ? ORDER BY created_at DESC"
+_GUEST_NAME_PAIRS_SQL = """
+    WITH names AS (
+        SELECT
+            id,
+            TRIM(COALESCE(name, '')) AS name,
+            TRIM(COALESCE(surname, '')) AS surname,
+            COALESCE(NULLIF(TRIM(COALESCE(full_name, '')), ''), TRIM(COALESCE(name, ''))) AS merged
+        FROM attendees
+    )
+    SELECT
+        CASE WHEN name <> '' AND surname <> '' THEN name
+             ELSE substr(merged, 1, instr(merged || ' ', ' ') - 1) END,
+        CASE WHEN name <> '' AND surname <> '' THEN surname
+             ELSE ltrim(substr(merged, instr(merged || ' ', ' '))) END
+    FROM names
+    ORDER BY id
+"""
+_LIST_USER_TICKETS_SQL = f"""
+    SELECT {", ".join(f"r.{column}" for column in _RESERVATION_COLUMNS)}, e.title
+    FROM reservations r
+    LEFT JOIN events e ON e.id = r.event_id
+    WHERE r.user_id = ?
+    ORDER BY r.created_at DESC
+    LIMIT ?
+"""
+_LIST_TICKET_ATTENDEE_NAMES_SQL = """
+    SELECT reservation_id, full_name
+    FROM attendees
+    WHERE reservation_id IN (SELECT value FROM json_each(?))
+    ORDER BY reservation_id, id
+"""
+_EXPORT_EVENT_CSV_SQL = """
+    SELECT r.code, r.ticket_type, r.boys, r.girls, r.quantity, r.total_price,
+           r.status, r.payment_file_type, r.payment_file_id, r.admin_note,
+           u.name, u.surname, u.phone
+    FROM reservations r
+    JOIN users u ON r.user_id = u.id
+    WHERE r.event_id = ?
+    ORDER BY r.created_at
+"""
+_INSERT_ATTENDEE_SQL = """
+    INSERT INTO attendees (
+        reservation_id, name, surname, full_name, gender,
+        repost_discount_applied, repost_proof_file_id, repost_proof_file_type, ticket_tier
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_LIST_ATTENDEES_SQL = f"SELECT {', '.join(_ATTENDEE_FIELDS)} FROM attendees WHERE reservation_id = ? ORDER BY id"
+
+_GUEST_LIST_SELECT = """
+    SELECT
+        a.id AS attendee_id,
+        a.full_name,
+        COALESCE(a.gender, 'unknown') AS gender,
+        r.id AS reservation_id,
+        r.code AS reservation_code,
+        r.status AS reservation_status,
+        e.id AS event_id,
+        e.title AS event_title,
+        e.event_datetime,
+        u.tg_id AS buyer_tg_id,
+        u.name AS buyer_name,
+        u.surname AS buyer_surname
+    FROM attendees a
+    JOIN reservations r ON r.id = a.reservation_id
+    JOIN events e ON e.id = r.event_id
+    JOIN users u ON u.id = r.user_id
+"""
+_GET_GUEST_SQL = _GUEST_LIST_SELECT + " WHERE a.id = ?"
+_GUEST_LIST_ORDER = {
+    "newest": "a.id DESC",
+    "name": "a.full_name COLLATE NOCASE ASC, a.id DESC",
+    "event": "e.event_datetime DESC, a.id DESC",
+    "reservation": "r.code ASC, a.id DESC",
+    "status": "r.status ASC, a.id DESC",
+}
+_GUEST_LIST_ANCHOR = """(
+        SELECT {columns}
+        FROM attendees anchor_a
+        JOIN reservations anchor_r ON anchor_r.id = anchor_a.reservation_id
+        JOIN events anchor_e ON anchor_e.id = anchor_r.event_id
+        WHERE anchor_a.id = ?
+    )"""
+_GUEST_LIST_CURSOR = {
+    "newest": "a.id < ?",
+    "name": "(a.full_name COLLATE NOCASE, -a.id) > "
+    + _GUEST_LIST_ANCHOR.format(columns="anchor_a.full_name, -anchor_a.id"),
+    "event": "(e.event_datetime, a.id) < " + _GUEST_LIST_ANCHOR.format(columns="anchor_e.event_datetime, anchor_a.id"),
+    "reservation": "(r.code, -a.id) > " + _GUEST_LIST_ANCHOR.format(columns="anchor_r.code, -anchor_a.id"),
+    "status": "(r.status, -a.id) > " + _GUEST_LIST_ANCHOR.format(columns="anchor_r.status, -anchor_a.id"),
+}
+_GUEST_LIST_SEARCH = """
+    AND (
+        a.full_name LIKE ? ESCAPE '\\'
+        OR r.code LIKE ? ESCAPE '\\'
+        OR e.title LIKE ? ESCAPE '\\'
+        OR u.name LIKE ? ESCAPE '\\'
+        OR u.surname LIKE ? ESCAPE '\\'
+        OR CAST(u.tg_id AS TEXT) LIKE ? ESCAPE '\\'
+    )
+"""
+_GUEST_LIST_SQL = {
+    (sort_by, searching, paging, limited): (
+        _GUEST_LIST_SELECT
+        + " WHERE 1 = 1"
+        + (_GUEST_LIST_SEARCH if searching else "")
+        + (f" AND {_GUEST_LIST_CURSOR[sort_by]}" if paging else "")
+        + f" ORDER BY {order_clause}"
+        + (" LIMIT ?" if limited else "")
+    )
+    for (sort_by, order_clause), searching, paging, limited in product(
+        _GUEST_LIST_ORDER.items(), (False, True), (False, True), (False, True)
+    )
+}
+
+_RESERVATION_SEARCH_SELECT = """
+    SELECT
+        r.id,
+        r.code,
+        r.status,
+        r.quantity,
+        r.boys,
+        r.girls,
+        r.total_price,
+        r.created_at,
+        e.id AS event_id,
+        e.title AS event_title,
+        e.event_datetime,
+        u.tg_id,
+        u.name AS buyer_name,
+        u.surname AS buyer_surname,
+        u.phone
+    FROM reservations r
+    JOIN events e ON e.id = r.event_id
+    JOIN users u ON u.id = r.user_id
+"""
+_RESERVATION_SEARCH_ORDER = {
+    "newest": "r.created_at DESC",
+    "amount": "r.total_price DESC, r.created_at DESC",
+    "status": "r.status ASC, r.created_at DESC",
+    "event_date": "e.event_datetime DESC, r.created_at DESC",
+}
+_RESERVATION_SEARCH_TEXT_WHERE = """
+    WHERE
+        r.code LIKE ? ESCAPE '\\'
+        OR e.title LIKE ? ESCAPE '\\'
+        OR u.name LIKE ? ESCAPE '\\'
+        OR u.surname LIKE ? ESCAPE '\\'
+        OR COALESCE(u.phone, '') LIKE ? ESCAPE '\\'
+"""
+_RESERVATION_SEARCH_MATCH_WHERE = "WHERE r.id IN (SELECT rowid FROM reservation_search WHERE reservation_search MATCH ?)"
+_RESERVATION_SEARCH_SQL = {
+    (sort_by, mode): f"{_RESERVATION_SEARCH_SELECT} {where} ORDER BY {order_clause} LIMIT ?"
+    for sort_by, order_clause in _RESERVATION_SEARCH_ORDER.items()
+    for mode, where in (
+        ("all", ""),
+        ("code", "WHERE r.code = ?"),
+        ("text", _RESERVATION_SEARCH_TEXT_WHERE),
+        ("digits", _RESERVATION_SEARCH_TEXT_WHERE + " OR CAST(u.tg_id AS TEXT) LIKE ? ESCAPE '\\'"),
+        ("match", _RESERVATION_SEARCH_MATCH_WHERE),
+    )
+}
+# Trigram tokens need at least three characters; shorter queries fall back to LIKE.
+_RESERVATION_SEARCH_MIN_MATCH = 3
+_RESERVATION_SEARCH_DOCUMENT = """
+    SELECT r.id, r.code, COALESCE(e.title, ''), COALESCE(u.name, ''), COALESCE(u.surname, ''),
+           COALESCE(u.phone, ''), COALESCE(CAST(u.tg_id AS TEXT), '')
+    FROM reservations r
+    LEFT JOIN events e ON e.id = r.event_id
+    LEFT JOIN users u ON u.id = r.user_id
+"""
+_RESERVATION_SEARCH_INSERT = (
+    "INSERT INTO reservation_search (rowid, code, title, buyer_name, buyer_surname, phone, tg_id)"
+    + _RESERVATION_SEARCH_DOCUMENT
+)
+_RESERVATION_SEARCH_TRIGGERS = (
+    "CREATE TRIGGER IF NOT EXISTS trg_reservation_search_insert AFTER INSERT ON reservations "
+    f"BEGIN {_RESERVATION_SEARCH_INSERT} WHERE r.id = NEW.id; END",
+    "CREATE TRIGGER IF NOT EXISTS trg_reservation_search_delete AFTER DELETE ON reservations "
+    "BEGIN DELETE FROM reservation_search WHERE rowid = OLD.id; END",
+    "CREATE TRIGGER IF NOT EXISTS trg_reservation_search_update "
+    "AFTER UPDATE OF code, event_id, user_id ON reservations "
+    "BEGIN DELETE FROM reservation_search WHERE rowid = OLD.id; "
+    f"{_RESERVATION_SEARCH_INSERT} WHERE r.id = NEW.id; END",
+    "CREATE TRIGGER IF NOT EXISTS trg_reservation_search_event AFTER UPDATE OF title ON events "
+    "BEGIN UPDATE reservation_search SET title = NEW.title "
+    "WHERE rowid IN (SELECT id FROM reservations WHERE event_id = NEW.id); END",
+    "CREATE TRIGGER IF NOT EXISTS trg_reservation_search_user "
+    "AFTER UPDATE OF name, surname, phone, tg_id ON users "
+    "BEGIN UPDATE reservation_search SET buyer_name = NEW.name, buyer_surname = NEW.surname, "
+    "phone = COALESCE(NEW.phone, ''), tg_id = CAST(NEW.tg_id AS TEXT) "
+    "WHERE rowid IN (SELECT id FROM reservations WHERE user_id = NEW.id); END",
+)
+
+_EVENT_STATS_COUNTERS = {
+    "approved_tickets": (STATUS_APPROVED, "quantity"),
+    "pending_tickets": (STATUS_PENDING, "quantity"),
+    "rejected_tickets": (STATUS_REJECTED, "quantity"),
+    "cancelled_tickets": (STATUS_CANCELLED, "quantity"),
+    "approved_revenue": (STATUS_APPROVED, "total_price"),
+    "pending_revenue": (STATUS_PENDING, "total_price"),
+}
+
+
+def _event_stats_delta(sign: str, ref: str) -> str:
+    assignments = ", ".join(
+        f"{counter} = {counter} {sign} (CASE WHEN {ref}.status = '{status}' THEN {ref}.{field} ELSE 0 END)"
+        for counter, (status, field) in _EVENT_STATS_COUNTERS.items()
+    )
+    return f"UPDATE event_stats SET {assignments} WHERE event_id = {ref}.event_id;"
+
+
+_EVENT_STATS_ADD = "INSERT OR IGNORE INTO event_stats (event_id) VALUES (NEW.event_id); " + _event_stats_delta("+", "NEW")
+_EVENT_STATS_REMOVE = _event_stats_delta("-", "OLD")
+_EVENT_STATS_TRIGGERS = (
+    f"CREATE TRIGGER IF NOT EXISTS trg_event_stats_insert AFTER INSERT ON reservations BEGIN {_EVENT_STATS_ADD} END",
+    f"CREATE TRIGGER IF NOT EXISTS trg_event_stats_delete AFTER DELETE ON reservations BEGIN {_EVENT_STATS_REMOVE} END",
+    "CREATE TRIGGER IF NOT EXISTS trg_event_stats_update "
+    "AFTER UPDATE OF event_id, status, quantity, total_price ON reservations "
+    f"BEGIN {_EVENT_STATS_REMOVE} {_EVENT_STATS_ADD} END",
+    "CREATE TRIGGER IF NOT EXISTS trg_event_stats_event_delete AFTER DELETE ON events "
+    "BEGIN DELETE FROM event_stats WHERE event_id = OLD.id; END",
+)
+_EVENT_STATS_BACKFILL_SQL = f"""
+    INSERT INTO event_stats (event_id, {", ".join(_EVENT_STATS_COUNTERS)})
+    SELECT
+        event_id,
+        {", ".join(
+            f"COALESCE(SUM({field}) FILTER (WHERE status = '{status}'), 0)"
+            for status, field in _EVENT_STATS_COUNTERS.values()
+        )}
+    FROM reservations
+    GROUP BY event_id
+"""
+
+_EVENT_STATS_SELECT = """
+    SELECT
+        e.id,
+        e.title,
+        e.event_datetime,
+        e.location,
+        COALESCE(s.approved_tickets, 0) AS approved_tickets,
+        COALESCE(s.pending_tickets, 0) AS pending_tickets,
+        COALESCE(s.rejected_tickets, 0) AS rejected_tickets,
+        COALESCE(s.cancelled_tickets, 0) AS cancelled_tickets,
+        COALESCE(s.approved_tickets + s.pending_tickets, 0) AS held_tickets,
+        COALESCE(s.approved_revenue, 0) AS approved_revenue,
+        COALESCE(s.pending_revenue, 0) AS pending_revenue
+    FROM events e
+    LEFT JOIN event_stats s ON s.event_id = e.id
+    WHERE e.status = 'open'
+"""
+_EVENT_STATS_ORDER = {
+    "date": "e.event_datetime DESC",
+    "title": "e.title COLLATE NOCASE ASC",
+    "approved": "approved_tickets DESC, e.event_datetime DESC",
+    "pending": "pending_tickets DESC, e.event_datetime DESC",
+    "sold": "held_tickets DESC, e.event_datetime DESC",
+    "revenue": "approved_revenue DESC, e.event_datetime DESC",
+}
+_EVENT_STATS_TTL_SECONDS = 5
+_QUOTE_EVENT_TTL_SECONDS = 5
+_QUOTE_EVENT_CACHE_SIZE = 256
+_EVENT_STATS_SQL = {
+    (sort_by, searching): (
+        _EVENT_STATS_SELECT
+        + (" AND (e.title LIKE ? ESCAPE '\\' OR e.location LIKE ? ESCAPE '\\')" if searching else "")
+        + f" ORDER BY {order_clause} LIMIT ?"
+    )
+    for sort_by, order_clause in _EVENT_STATS_ORDER.items()
+    for searching in (False, True)
+}
+
+_EVENT_FIELD_COLUMNS = {
+    "title": "title",
+    "location": "location",
+    "datetime": "event_datetime",
+    "caption": "caption",
+    "photo": "photo_file_id",
+    "early_boy": "early_bird_price",
+    "early_girl": "early_bird_price_girl",
+    "early_qty": "early_bird_qty",
+    "tier1_boy": "regular_tier1_price",
+    "tier1_girl": "regular_tier1_price_girl",
+    "tier1_qty": "regular_tier1_qty",
+    "tier2_boy": "regular_tier2_price",
+    "tier2_girl": "regular_tier2_price_girl",
+    "tier2_qty": "regular_tier2_qty",
+    "repost_discount_enabled": "repost_discount_enabled",
+    "repost_discount_amount": "repost_discount_amount",
+    "girls_group_offer_enabled": "girls_group_offer_enabled",
+    "boys_group_offer_enabled": "boys_group_offer_enabled",
+    "payment1_title": "payment1_title",
+    "payment1_url": "payment1_url",
+    "payment2_title": "payment2_title",
+    "payment2_url": "payment2_url",
+    "payment3_title": "payment3_title",
+    "payment3_url": "payment3_url",
+}
+
+_TRUE_FLAGS = frozenset({"1", "true", "yes", "on"})
+_FALSE_FLAGS = frozenset({"0", "false", "no", "off", ""})
+
+
+def _parse_event_datetime(value: str) -> datetime:
+    match = EVENT_DT_PATTERN.fullmatch(value)
+    if match:
+        year, month, day, hour, minute = (int(part) for part in match.groups())
+        return datetime(year, month, day, hour, minute, tzinfo=BUDAPEST_TZ)
+    parsed = datetime.strptime(value, EVENT_DT_FORMAT)
+    return parsed.replace(tzinfo=BUDAPEST_TZ)
+
+
+def _validate_datetime(key: str, value: Any) -> Tuple[Any, Optional[str]]:
+    try:
+        _parse_event_datetime(str(value))
+    except ValueError:
+        return value, "Invalid datetime format. Use YYYY-MM-DD HH:MM"
+    return value, None
+
+
+def _validate_qty(key: str, value: Any) -> Tuple[Any, Optional[str]]:
+    try:
+        ivalue = int(value)
+    except (TypeError, ValueError):
+        return value, f"{key} must be integer."
+    if ivalue < 0:
+        return value, f"{key} must be non-negative."
+    return ivalue, None
+
+
+def _validate_amount(key: str, value: Any) -> Tuple[Any, Optional[str]]:
+    try:
+        fvalue = float(value)
+    except (TypeError, ValueError):
+        return value, f"{key} must be number."
+    if fvalue < 0:
+        return value, f"{key} must be non-negative."
+    return fvalue, None
+
+
+def _validate_flag(key: str, value: Any) -> Tuple[Any, Optional[str]]:
+    if not isinstance(value, str):
+        return 1 if bool(value) else 0, None
+    normalized = value.strip().lower()
+    if normalized in _TRUE_FLAGS:
+        return 1, None
+    if normalized in _FALSE_FLAGS:
+        return 0, None
+    return value, f"{key} must be boolean."
+
+
+def _validate_text(key: str, value: Any) -> Tuple[Any, Optional[str]]:
+    return str(value or "").strip(), None
+
+
+def _validate_url(key: str, value: Any) -> Tuple[Any, Optional[str]]:
+    value = str(value or "").strip()
+    if value and not value.lower().startswith("https://"):
+        return value, f"{key} must start with https://"
+    return value, None
+
+
+def _keep_value(key: str, value: Any) -> Tuple[Any, Optional[str]]:
+    return value, None
+
+
+_EVENT_FIELD_VALIDATORS: Dict[str, Callable[[str, Any], Tuple[Any, Optional[str]]]] = {
+    "datetime": _validate_datetime,
+    **dict.fromkeys(("early_qty", "tier1_qty", "tier2_qty"), _validate_qty),
+    **dict.fromkeys(
+        ("early_boy", "early_girl", "tier1_boy", "tier1_girl", "tier2_boy", "tier2_girl", "repost_discount_amount"),
+        _validate_amount,
+    ),
+    **dict.fromkeys(("repost_discount_enabled", "girls_group_offer_enabled", "boys_group_offer_enabled"), _validate_flag),
+    **dict.fromkeys(("payment1_title", "payment2_title", "payment3_title"), _validate_text),
+    **dict.fromkeys(("payment1_url", "payment2_url", "payment3_url"), _validate_url),
+}
+
+_GUEST_REMOVAL_SELECT = f"""
+    SELECT
+        a.id AS attendee_id,
+        a.full_name,
+        COALESCE(a.gender, 'unknown') AS gender,
+        COALESCE(a.repost_discount_applied, 0) AS repost_discount_applied,
+        COALESCE(a.ticket_tier, '') AS attendee_tier,
+        r.*,
+        {_JOINED_EVENT_COLUMNS}
+    FROM attendees a
+    JOIN reservations r ON r.id = a.reservation_id
+    LEFT JOIN events e ON e.id = r.event_id
+"""
+_REMOVE_GUEST_BY_ID_SQL = _GUEST_REMOVAL_SELECT + " WHERE a.id = ?"
+_REMOVE_GUEST_BY_NAME_SQL = _GUEST_REMOVAL_SELECT + f"""
+    WHERE r.event_id = ?
+      AND r.status IN ({", ".join("?" * len(ADMIN_MUTABLE_STATUSES))})
+      AND (
+            LOWER(TRIM(a.full_name)) = LOWER(TRIM(?))
+            OR (LOWER(TRIM(a.name)) = LOWER(TRIM(?)) AND LOWER(TRIM(a.surname)) = LOWER(TRIM(?)))
+      )
+    ORDER BY a.id DESC
+    LIMIT 1
+"""
+
+_RESERVATION_TOTAL_FIELDS = (
+    "quantity",
+    "boys",
+    "girls",
+    "total_price",
+    "base_total_price",
+    "girls_group_free_count",
+    "boys_group_free_count",
+    "girls_group_discount_amount",
+    "boys_group_discount_amount",
+    "group_discount_amount",
+    "discount_count",
+    "discount_amount",
+)
+_EMPTY_RESERVATION_TOTALS: Dict[str, Any] = {
+    field: 0.0 if field.endswith(("price", "amount")) else 0 for field in _RESERVATION_TOTAL_FIELDS
+}
+
+
+class TierAllocation(NamedTuple):
+    tier_key: str
+    gender: str
+    unit_price: float
+
+
+_TIER_QTY_COLUMNS = {
+    "early": "early_bird_qty",
+    "tier1": "regular_tier1_qty",
+    "tier2": "regular_tier2_qty",
+}
+_HOLD_APPLY_SQL = {
+    tier_key: f"UPDATE events SET {column} = {column} - ? WHERE id = ? AND {column} >= ?"
+    for tier_key, column in _TIER_QTY_COLUMNS.items()
+}
+_HOLD_RELEASE_SQL = {
+    tier_key: f"UPDATE events SET {column} = {column} + ? WHERE id = ?"
+    for tier_key, column in _TIER_QTY_COLUMNS.items()
+}
+_EVENT_PRICE_UPDATE_SQL = {
+    price_field: f"UPDATE events SET {_EVENT_FIELD_COLUMNS[price_field]} = ? WHERE id = ?"
+    for price_field in ("early_boy", "early_girl", "tier1_boy", "tier1_girl", "tier2_boy", "tier2_girl")
+}
+_HOLD_RELEASE_ALL_SQL = (
+    f"UPDATE events SET {', '.join(f'{column} = {column} + ?' for column in _TIER_QTY_COLUMNS.values())} WHERE id = ?"
+)
+
+
+_SHARED_PRAGMAS = (
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA cache_size = -65536",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 268435456",
+)
 
 
 class Database:
     def __init__(self, path: str) -> None:
-        dir_name = os.path.dirname(path)
-        if dir_name:
-            os.makedirs(dir_name, exist_ok=True)
-        self.conn = sqlite3.connect(path, check_same_thread=False)
+        parent = Path(path).parent
+        if parent != Path(".") and not parent.is_dir():
+            parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False, cached_statements=256)
+        self._table_columns_cache: Dict[str, frozenset] = {}
+        self._reservation_insert_sql: Dict[Tuple[Tuple[str, ...], bool], str] = {}
+        self._event_update_sql: Dict[Tuple[str, ...], str] = {}
+        self._event_insert_sql: Dict[Tuple[str, ...], str] = {}
+        self._event_stats_cache: Dict[Tuple[str, Optional[str], int], List[sqlite3.Row]] = {}
+        self._event_stats_stamp: Tuple[int, int] = (-1, -1)
+        self._quote_event_cache: Dict[int, Optional[Event]] = {}
+        self._quote_event_stamp: Tuple[int, int] = (-1, -1)
+        self._write_lock = threading.RLock()
+        self._transaction_depth = 0
+        self._write_owner: Optional[int] = None
+        self._local = threading.local()
+        self._read_only_uri = None if path in ("", ":memory:") else Path(path).resolve().as_uri() + "?mode=ro"
         self.conn.row_factory = sqlite3.Row
         self.conn.execute("PRAGMA foreign_keys = ON")
         self.conn.execute("PRAGMA journal_mode = WAL")
         self.conn.execute("PRAGMA synchronous = NORMAL")
+        for pragma in _SHARED_PRAGMAS:
+            self.conn.execute(pragma)
         self._init_schema()
         self._migrate_schema()
+        self.conn.execute("PRAGMA optimize")
+        for table_name in ("events", "reservations", "attendees"):
+            self._table_columns(table_name)
 
     def _init_schema(self) -> None:
-        cursor = self.conn.cursor()
+        cursor = self._cursor()
         cursor.execute(
             """
             CREATE TABLE IF NOT EXISTS users (
@@ -128,10 +680,47 @@ class Database:
             )
             """
         )
+        cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_reservations_event_status_cover
+            ON reservations(event_id, status, quantity, total_price)
+            """
+        )
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_attendees_reservation ON attendees(reservation_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_reservations_created_at ON reservations(created_at)")
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_reservations_user_created ON reservations(user_id, created_at DESC)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_events_open_by_date ON events(event_datetime DESC) WHERE status = 'open'"
+        )
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS event_stats (
+                event_id INTEGER PRIMARY KEY,
+                approved_tickets INTEGER NOT NULL DEFAULT 0,
+                pending_tickets INTEGER NOT NULL DEFAULT 0,
+                rejected_tickets INTEGER NOT NULL DEFAULT 0,
+                cancelled_tickets INTEGER NOT NULL DEFAULT 0,
+                approved_revenue REAL NOT NULL DEFAULT 0,
+                pending_revenue REAL NOT NULL DEFAULT 0
+            )
+            """
+        )
+        cursor.execute(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS reservation_search
+            USING fts5(code, title, buyer_name, buyer_surname, phone, tg_id, tokenize = 'trigram')
+            """
+        )
+        for trigger_sql in chain(_EVENT_STATS_TRIGGERS, _RESERVATION_SEARCH_TRIGGERS):
+            cursor.execute(trigger_sql)
         self.conn.commit()
 
     def _migrate_schema(self) -> None:
-        cursor = self.conn.cursor()
+        cursor = self._cursor()
+        if cursor.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
 
         event_cols = self._table_columns("events")
         if "caption" not in event_cols:
@@ -214,6 +803,8 @@ class Database:
             cursor.execute("ALTER TABLE reservations ADD COLUMN hold_applied INTEGER NOT NULL DEFAULT 1")
 
         cursor.execute("UPDATE reservations SET status = ? WHERE status = 'reserved'", (STATUS_APPROVED,))
+        cursor.execute("UPDATE reservations SET status = LOWER(TRIM(status)) WHERE status <> LOWER(TRIM(status))")
+        cursor.execute("DROP INDEX IF EXISTS idx_reservations_event_status")
 
         attendee_cols = self._table_columns("attendees")
         if "full_name" not in attendee_cols:
@@ -248,57 +839,226 @@ class Database:
             """
         )
 
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_attendees_full_name_nocase ON attendees(full_name COLLATE NOCASE, id DESC)"
+        )
+
+        cursor.execute("DELETE FROM event_stats")
+        cursor.execute(_EVENT_STATS_BACKFILL_SQL)
+        cursor.execute("DELETE FROM reservation_search")
+        cursor.execute(_RESERVATION_SEARCH_INSERT)
+
+        cursor.execute("ANALYZE")
+        cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
         self.conn.commit()
+        self._table_columns_cache.clear()
 
     def _backfill_attendee_genders(self, cursor: sqlite3.Cursor) -> None:
-        reservation_rows = cursor.execute(
-            "SELECT id, boys, girls FROM reservations ORDER BY id"
+        rows = cursor.execute(
+            """
+            SELECT r.id, r.boys, r.girls, a.id, a.gender
+            FROM reservations r
+            JOIN attendees a ON a.reservation_id = r.id
+            ORDER BY r.id, a.id
+            """
         ).fetchall()
-        for reservation in reservation_rows:
-            attendee_rows = cursor.execute(
-                """
-                SELECT id
-                FROM attendees
-                WHERE reservation_id = ?
-                ORDER BY id
-                """,
-                (reservation["id"],),
-            ).fetchall()
-            boys = int(reservation["boys"] or 0)
-            girls = int(reservation["girls"] or 0)
-            for idx, attendee in enumerate(attendee_rows):
+        updates: List[Tuple[str, int]] = []
+        for _reservation_id, attendee_rows in groupby(rows, key=lambda row: row[0]):
+            for idx, (_rid, boys, girls, attendee_id, current) in enumerate(attendee_rows):
+                boys = int(boys or 0)
                 if idx < boys:
                     gender = "boy"
-                elif idx < boys + girls:
+                elif idx < boys + int(girls or 0):
                     gender = "girl"
                 else:
                     gender = "unknown"
-                cursor.execute(
-                    "UPDATE attendees SET gender = ? WHERE id = ? AND (gender IS NULL OR gender = '' OR gender = 'unknown')",
-                    (gender, attendee["id"]),
-                )
+                if current in (None, "", "unknown") and current != gender:
+                    updates.append((gender, attendee_id))
+        cursor.executemany("UPDATE attendees SET gender = ? WHERE id = ?", updates)
+
+    @contextmanager
+    def _write_transaction(self) -> Iterator[None]:
+        with self._write_lock:
+            if self._transaction_depth:
+                savepoint = f"write_tx_{self._transaction_depth}"
+                self.conn.execute(f"SAVEPOINT {savepoint}")
+                self._transaction_depth += 1
+                try:
+                    yield
+                except BaseException:
+                    self.conn.execute(f"ROLLBACK TO {savepoint}")
+                    self.conn.execute(f"RELEASE {savepoint}")
+                    raise
+                finally:
+                    self._transaction_depth -= 1
+                self.conn.execute(f"RELEASE {savepoint}")
+                return
+
+            if not self.conn.in_transaction:
+                self.conn.execute("BEGIN IMMEDIATE")
+            self._transaction_depth = 1
+            self._write_owner = threading.get_ident()
+            try:
+                yield
+            except BaseException:
+                self.conn.rollback()
+                raise
+            finally:
+                self._transaction_depth = 0
+                self._write_owner = None
+            self.conn.commit()
 
-    def _table_columns(self, table_name: str) -> set:
-        cursor = self.conn.cursor()
+    @contextmanager
+    def batch_admin_ops(self) -> Iterator[None]:
+        with self._write_transaction():
+            yield
+
+    def _cursor(self) -> sqlite3.Cursor:
+        cursor = getattr(self._local, "cursor", None)
+        if cursor is None:
+            cursor = self._local.cursor = self.conn.cursor()
+        return cursor
+
+    def _open_reader(self, **options: Any) -> sqlite3.Connection:
+        reader = sqlite3.connect(self._read_only_uri, uri=True, **options)
+        reader.row_factory = sqlite3.Row
+        for pragma in _SHARED_PRAGMAS:
+            reader.execute(pragma)
+        return reader
+
+    def _read_connection(self) -> sqlite3.Connection:
+        """Return this thread's cached read-only connection.
+
+        Only for queries that are fully fetched before the caller returns: a cursor left
+        open across a yield pins a snapshot for every later read on this thread. Use
+        _stream_connection() for generators.
+        """
+        if self._read_only_uri is None or self._write_owner == threading.get_ident():
+            return self.conn
+        reader = getattr(self._local, "reader", None)
+        if reader is None:
+            reader = self._local.reader = self._open_reader(check_same_thread=False, cached_statements=256)
+        return reader
+
+    @contextmanager
+    def _stream_connection(self) -> Iterator[sqlite3.Connection]:
+        """Open a private read-only connection for a read that is consumed lazily.
+
+        Starlette resumes sync generators on any threadpool thread, so the connection is
+        not thread-bound and is closed when the generator finishes or is closed.
+        """
+        if self._read_only_uri is None:
+            yield self.conn
+            return
+        reader = self._open_reader(check_same_thread=False)
+        try:
+            yield reader
+        finally:
+            reader.close()
+
+    def _read_cursor(self) -> sqlite3.Cursor:
+        reader = self._read_connection()
+        if reader is self.conn:
+            return self._cursor()
+        cursor = getattr(self._local, "read_cursor", None)
+        if cursor is None:
+            cursor = self._local.read_cursor = reader.cursor()
+        return cursor
+
+    def _table_columns(self, table_name: str) -> frozenset:
+        cached = self._table_columns_cache.get(table_name)
+        if cached is not None:
+            return cached
+        cursor = self._cursor()
         cursor.execute(f"PRAGMA table_info({table_name})")
-        return {row["name"] for row in cursor.fetchall()}
+        columns = frozenset(row["name"] for row in cursor.fetchall())
+        self._table_columns_cache[table_name] = columns
+        return columns
+
+    def _reservation_insert_statement(self, columns: Tuple[str, ...], returning: bool = False) -> str:
+        sql = self._reservation_insert_sql.get((columns, returning))
+        if sql is None:
+            placeholders = ", ".join("?" * len(columns))
+            sql = f"INSERT INTO reservations ({', '.join(columns)}) VALUES ({placeholders})"
+            if returning:
+                sql += f" RETURNING {_RESERVATION_RETURNING_COLUMNS}"
+            self._reservation_insert_sql[(columns, returning)] = sql
+        return sql
+
+    def _event_insert_statement(self, columns: Tuple[str, ...]) -> str:
+        sql = self._event_insert_sql.get(columns)
+        if sql is None:
+            sql = f"INSERT INTO events ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+            self._event_insert_sql[columns] = sql
+        return sql
+
+    def _event_update_statement(self, columns: Tuple[str, ...]) -> str:
+        sql = self._event_update_sql.get(columns)
+        if sql is None:
+            sql = f"UPDATE events SET {', '.join(f'{column} = ?' for column in columns)} WHERE id = ?"
+            self._event_update_sql[columns] = sql
+        return sql
+
+    def _insert_reservation(self, cursor: sqlite3.Cursor, insert_values: Dict[str, Any]) -> int:
+        cursor.execute(self._reservation_insert_statement(tuple(insert_values)), tuple(insert_values.values()))
+        return int(cursor.lastrowid)
+
+    def _insert_reservation_returning(self, cursor: sqlite3.Cursor, insert_values: Dict[str, Any]) -> Reservation:
+        cursor.execute(
+            self._reservation_insert_statement(tuple(insert_values), returning=True),
+            tuple(insert_values.values()),
+        )
+        return Reservation.from_row(cursor.fetchone())
+
+    def _reservation_code(self, prefix: str, event_id: int) -> str:
+        return f"{prefix}{event_id}-{secrets.token_hex(4).upper()}"
+
+    def _fresh_reservation_codes(self, cursor: sqlite3.Cursor, prefix: str, event_id: int, count: int) -> List[str]:
+        raw = secrets.token_bytes(4 * count)
+        codes = [f"{prefix}{event_id}-{raw[offset:offset + 4].hex().upper()}" for offset in range(0, len(raw), 4)]
+        while True:
+            cursor.execute(
+                "SELECT code FROM reservations WHERE code IN (SELECT value FROM json_each(?))",
+                (json.dumps(codes),),
+            )
+            taken = {row[0] for row in cursor.fetchall()}
+            seen = set()
+            clashes = []
+            for index, code in enumerate(codes):
+                if code in taken or code in seen:
+                    clashes.append(index)
+                seen.add(code)
+            if not clashes:
+                return codes
+            for index in clashes:
+                codes[index] = self._reservation_code(prefix, event_id)
+
+    def _like_pattern(self, text: str) -> str:
+        escaped = unicodedata.normalize("NFC", text or "").lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return f"%{escaped}%"
 
     def _utc_now(self) -> str:
         return datetime.now(timezone.utc).isoformat()
 
     def parse_event_datetime(self, value: str) -> datetime:
-        parsed = datetime.strptime(value, EVENT_DT_FORMAT)
-        return parsed.replace(tzinfo=BUDAPEST_TZ)
-
-    def _tier_qty_column(self, tier_key: str) -> str:
-        mapping = {
-            "early": "early_bird_qty",
-            "tier1": "regular_tier1_qty",
-            "tier2": "regular_tier2_qty",
-        }
-        if tier_key not in mapping:
+        return _parse_event_datetime(value)
+
+    def _require_write_transaction(self) -> None:
+        if not self._transaction_depth or self._write_owner != threading.get_ident():
+            raise RuntimeError("Inventory changes must run inside a write transaction")
+
+    def _apply_tier_hold(self, cursor: sqlite3.Cursor, event_id: int, tier_key: str, qty: int) -> bool:
+        self._require_write_transaction()
+        if tier_key not in _HOLD_APPLY_SQL:
+            raise ValueError("Unknown ticket type")
+        cursor.execute(_HOLD_APPLY_SQL[tier_key], (int(qty), event_id, int(qty)))
+        return cursor.rowcount > 0
+
+    def _release_tier_hold(self, cursor: sqlite3.Cursor, event_id: int, tier_key: str, qty: int) -> None:
+        self._require_write_transaction()
+        if tier_key not in _HOLD_RELEASE_SQL:
             raise ValueError("Unknown ticket type")
-        return mapping[tier_key]
+        cursor.execute(_HOLD_RELEASE_SQL[tier_key], (int(qty), event_id))
 
     def _tier_prices(self, event: Event, tier_key: str) -> Tuple[float, float]:
         if tier_key == "early":
@@ -340,22 +1100,20 @@ class Database:
     def _group_offer_breakdown(
         self,
         event: Event,
-        attendee_allocations: List[Dict[str, Any]],
+        attendee_allocations: List[TierAllocation],
     ) -> Tuple[int, float, int, float]:
         girls_allocations = sorted(
-            [item for item in attendee_allocations if item["gender"] == "girl"],
-            key=lambda item: float(item["unit_price"]),
+            [item.unit_price for item in attendee_allocations if item.gender == "girl"],
         )
         boys_allocations = sorted(
-            [item for item in attendee_allocations if item["gender"] == "boy"],
-            key=lambda item: float(item["unit_price"]),
+            [item.unit_price for item in attendee_allocations if item.gender == "boy"],
         )
 
         girls_group_free_count = (len(girls_allocations) // 3) if bool(event.girls_group_offer_enabled) else 0
         boys_group_free_count = (len(boys_allocations) // 4) if bool(event.boys_group_offer_enabled) else 0
 
-        girls_group_discount_amount = sum(float(item["unit_price"]) for item in girls_allocations[:girls_group_free_count])
-        boys_group_discount_amount = sum(float(item["unit_price"]) for item in boys_allocations[:boys_group_free_count])
+        girls_group_discount_amount = sum(girls_allocations[:girls_group_free_count])
+        boys_group_discount_amount = sum(boys_allocations[:boys_group_free_count])
         return (
             girls_group_free_count,
             girls_group_discount_amount,
@@ -375,12 +1133,12 @@ class Database:
         if quantity > total_remaining:
             raise ValueError("Not enough tickets remaining across all tiers")
 
-        genders = (["boy"] * int(boys)) + (["girl"] * int(girls))
+        genders = chain(repeat("boy", int(boys)), repeat("girl", int(girls)))
         tiers = self._tier_sequence(event)
         tier_remaining = {tier["key"]: int(tier["remaining"]) for tier in tiers}
         tier_lookup = {tier["key"]: tier for tier in tiers}
 
-        attendee_allocations: List[Dict[str, Any]] = []
+        attendee_allocations: List[TierAllocation] = []
         tier_usage: Dict[str, Dict[str, Any]] = {}
         total_price = 0.0
 
@@ -398,13 +1156,7 @@ class Database:
             tier_info = tier_lookup[selected_tier]
             unit_price = float(tier_info["boy_price"] if gender == "boy" else tier_info["girl_price"])
             total_price += unit_price
-            attendee_allocations.append(
-                {
-                    "tier_key": selected_tier,
-                    "gender": gender,
-                    "unit_price": unit_price,
-                }
-            )
+            attendee_allocations.append(TierAllocation(selected_tier, gender, unit_price))
             if selected_tier not in tier_usage:
                 tier_usage[selected_tier] = {
                     "tier_key": selected_tier,
@@ -424,7 +1176,7 @@ class Database:
 
         breakdown = [tier_usage[tier["key"]] for tier in tiers if tier["key"] in tier_usage]
         hold_counts = {key: value["count"] for key, value in tier_usage.items()}
-        primary_tier_key = attendee_allocations[0]["tier_key"] if attendee_allocations else "early"
+        primary_tier_key = attendee_allocations[0].tier_key if attendee_allocations else "early"
         girls_group_free_count, girls_group_discount_amount, boys_group_free_count, boys_group_discount_amount = (
             self._group_offer_breakdown(event, attendee_allocations)
         )
@@ -444,8 +1196,17 @@ class Database:
             "group_discount_amount": group_discount_amount,
         }
 
+    def _quote_event(self, event_id: int) -> Optional[Event]:
+        stamp = self.change_stamp(_QUOTE_EVENT_TTL_SECONDS)
+        if stamp != self._quote_event_stamp or len(self._quote_event_cache) >= _QUOTE_EVENT_CACHE_SIZE:
+            self._quote_event_cache = {}
+            self._quote_event_stamp = stamp
+        if event_id not in self._quote_event_cache:
+            self._quote_event_cache[event_id] = self.get_event(event_id)
+        return self._quote_event_cache[event_id]
+
     def quote_booking(self, event_id: int, boys: int, girls: int) -> Dict[str, Any]:
-        event = self.get_event(event_id)
+        event = self._quote_event(event_id)
         if not event:
             raise ValueError("Event not found")
         plan = self._allocate_tier_plan(event, boys, girls)
@@ -466,15 +1227,7 @@ class Database:
         }
 
     def _normalize_gender(self, value: str) -> Optional[str]:
-        mapping = {
-            "boy": "boy",
-            "male": "boy",
-            "m": "boy",
-            "girl": "girl",
-            "female": "girl",
-            "f": "girl",
-        }
-        return mapping.get((value or "").strip().lower())
+        return _GENDER_MAP.get(value.strip().lower() if value else "")
 
     def _name_parts(self, name: str, surname: str, full_name: str) -> Tuple[str, str]:
         left = (name or "").strip()
@@ -485,24 +1238,22 @@ class Database:
         merged = (full_name or "").strip() or left
         if not merged:
             return "", ""
-        tokens = merged.split()
+        tokens = merged.split(None, 1)
         if len(tokens) == 1:
             return tokens[0], ""
-        return tokens[0], " ".join(tokens[1:])
+        return tokens[0], tokens[1]
 
     def _ensure_user_for_tg(self, tg_id: int, cursor: sqlite3.Cursor) -> int:
-        cursor.execute("SELECT id FROM users WHERE tg_id = ?", (tg_id,))
-        existing = cursor.fetchone()
-        if existing:
-            return int(existing["id"])
         cursor.execute(
             """
             INSERT INTO users (tg_id, name, surname, phone, blocked, blocked_reason)
             VALUES (?, ?, ?, ?, 0, '')
+            ON CONFLICT(tg_id) DO UPDATE SET tg_id = excluded.tg_id
+            RETURNING id
             """,
             (tg_id, "Admin", "User", "admin"),
         )
-        return int(cursor.lastrowid)
+        return int(cursor.fetchone()[0])
 
     def _release_hold(self, reservation_row: sqlite3.Row, cursor: sqlite3.Cursor) -> None:
         if reservation_row["hold_applied"] != 1:
@@ -512,14 +1263,16 @@ class Database:
             ticket_type = (reservation_row["ticket_type"] or "").strip()
             if ticket_type:
                 hold_counts = {ticket_type: int(reservation_row["quantity"] or 0)}
-        for tier_key, qty in hold_counts.items():
-            if qty <= 0:
-                continue
-            qty_column = self._tier_qty_column(tier_key)
-            cursor.execute(
-                f"UPDATE events SET {qty_column} = {qty_column} + ? WHERE id = ?",
-                (int(qty), reservation_row["event_id"]),
-            )
+        hold_counts = {tier_key: int(qty) for tier_key, qty in hold_counts.items() if qty > 0}
+        if not hold_counts:
+            return
+        self._require_write_transaction()
+        if not hold_counts.keys() <= _TIER_QTY_COLUMNS.keys():
+            raise ValueError("Unknown ticket type")
+        cursor.execute(
+            _HOLD_RELEASE_ALL_SQL,
+            (*(hold_counts.get(tier_key, 0) for tier_key in _TIER_QTY_COLUMNS), reservation_row["event_id"]),
+        )
 
     def _reservation_hold_counts(self, reservation_id: int, cursor: sqlite3.Cursor) -> Dict[str, int]:
         cursor.execute(
@@ -540,89 +1293,55 @@ class Database:
 
     def _is_admin_mutable_reservation_status(self, status: str) -> bool:
         normalized = (status or "").strip().lower()
-        return normalized in {
-            STATUS_PENDING,
-            STATUS_APPROVED,
-            STATUS_REJECTED,
-            *LEGACY_PENDING_STATUSES,
-            "pending_payment",
-            "pending_review",
-            "pending_payment_approval",
-        }
+        return normalized in ADMIN_MUTABLE_STATUSES
 
     def upsert_user(self, tg_id: int, name: str, surname: str, phone: str) -> None:
-        cursor = self.conn.cursor()
-        cursor.execute(
-            """
-            INSERT INTO users (tg_id, name, surname, phone)
-            VALUES (?, ?, ?, ?)
-            ON CONFLICT(tg_id) DO UPDATE SET
-                name=excluded.name,
-                surname=excluded.surname,
-                phone=excluded.phone
-            """,
-            (tg_id, name, surname, phone),
-        )
-        self.conn.commit()
+        with self._write_transaction():
+            cursor = self._cursor()
+            cursor.execute(
+                """
+                INSERT INTO users (tg_id, name, surname, phone)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(tg_id) DO UPDATE SET
+                    name=excluded.name,
+                    surname=excluded.surname,
+                    phone=excluded.phone
+                """,
+                (tg_id, name, surname, phone),
+            )
 
     def get_user(self, tg_id: int) -> Optional[User]:
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM users WHERE tg_id = ?", (tg_id,))
+        cursor = self._read_cursor()
+        cursor.execute(_GET_USER_SQL, (tg_id,))
         row = cursor.fetchone()
-        return User(**dict(row)) if row else None
+        return User.from_row(row) if row else None
 
     def get_user_by_id(self, user_id: int) -> Optional[User]:
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
+        cursor = self._read_cursor()
+        cursor.execute(_GET_USER_BY_ID_SQL, (user_id,))
         row = cursor.fetchone()
-        return User(**dict(row)) if row else None
+        return User.from_row(row) if row else None
 
     def is_blocked(self, tg_id: int) -> bool:
-        cursor = self.conn.cursor()
+        cursor = self._read_cursor()
         cursor.execute("SELECT blocked FROM users WHERE tg_id = ?", (tg_id,))
         row = cursor.fetchone()
         return bool(row["blocked"]) if row else False
 
+    def change_stamp(self, ttl_seconds: int) -> Tuple[int, int]:
+        return self.conn.total_changes, int(time.monotonic() // ttl_seconds)
+
     def list_events(self) -> List[Event]:
-        cursor = self.conn.cursor()
-        cursor.execute(
-            """
-            SELECT id, title, event_datetime, location, caption, photo_file_id,
-                   early_bird_price, early_bird_price_girl, early_bird_qty,
-                   regular_tier1_price, regular_tier1_price_girl, regular_tier1_qty,
-                   regular_tier2_price, regular_tier2_price_girl, regular_tier2_qty,
-                   status, repost_discount_enabled, repost_discount_amount,
-                   girls_group_offer_enabled, boys_group_offer_enabled,
-                   payment1_title, payment1_url,
-                   payment2_title, payment2_url,
-                   payment3_title, payment3_url
-            FROM events
-            WHERE status = 'open'
-            ORDER BY event_datetime
-            """
-        )
-        return [Event(**dict(row)) for row in cursor.fetchall()]
+        cursor = self._read_connection().cursor()
+        cursor.row_factory = None
+        cursor.execute(_LIST_OPEN_EVENTS_SQL)
+        return [Event.from_row(row) for row in cursor.fetchall()]
 
     def get_event(self, event_id: int) -> Optional[Event]:
-        cursor = self.conn.cursor()
-        cursor.execute(
-            """
-            SELECT id, title, event_datetime, location, caption, photo_file_id,
-                   early_bird_price, early_bird_price_girl, early_bird_qty,
-                   regular_tier1_price, regular_tier1_price_girl, regular_tier1_qty,
-                   regular_tier2_price, regular_tier2_price_girl, regular_tier2_qty,
-                   status, repost_discount_enabled, repost_discount_amount,
-                   girls_group_offer_enabled, boys_group_offer_enabled,
-                   payment1_title, payment1_url,
-                   payment2_title, payment2_url,
-                   payment3_title, payment3_url
-            FROM events
-            WHERE id = ?
-            """,
-            (event_id,),
-        )
+        cursor = self._read_cursor()
+        cursor.execute(_GET_EVENT_SQL, (event_id,))
         row = cursor.fetchone()
-        return Event(**dict(row)) if row else None
+        return Event.from_row(row) if row else None
 
     def create_event(
         self,
@@ -686,27 +1405,46 @@ class Database:
         if "capacity" in event_cols:
             insert_values["capacity"] = None
 
-        columns = [col for col in insert_values.keys() if col in event_cols]
-        placeholders = ", ".join(["?"] * len(columns))
-        cursor = self.conn.cursor()
-        cursor.execute(
-            f"INSERT INTO events ({', '.join(columns)}) VALUES ({placeholders})",
-            tuple(insert_values[col] for col in columns),
-        )
-        self.conn.commit()
-        return cursor.lastrowid
+        columns = tuple(col for col in insert_values if col in event_cols)
+        with self._write_transaction():
+            cursor = self._cursor()
+            cursor.execute(self._event_insert_statement(columns), tuple(insert_values[col] for col in columns))
+            return cursor.lastrowid
 
     def active_tier(self, event: Event) -> Optional[Dict[str, float]]:
-        for tier in self._tier_sequence(event):
-            if tier["remaining"] > 0:
-                return {
-                    "key": tier["key"],
-                    "name": tier["name"],
-                    "boy_price": tier["boy_price"],
-                    "girl_price": tier["girl_price"],
-                    "remaining": tier["remaining"],
-                }
-        return None
+        if event.early_bird_qty > 0:
+            key, name, remaining, boy_price, girl_price = (
+                "early",
+                "Early Bird",
+                event.early_bird_qty,
+                event.early_bird_price,
+                event.early_bird_price_girl,
+            )
+        elif event.regular_tier1_qty > 0:
+            key, name, remaining, boy_price, girl_price = (
+                "tier1",
+                "Regular Tier-1",
+                event.regular_tier1_qty,
+                event.regular_tier1_price,
+                event.regular_tier1_price_girl,
+            )
+        elif event.regular_tier2_qty > 0:
+            key, name, remaining, boy_price, girl_price = (
+                "tier2",
+                "Regular Tier-2",
+                event.regular_tier2_qty,
+                event.regular_tier2_price,
+                event.regular_tier2_price_girl,
+            )
+        else:
+            return None
+        return {
+            "key": key,
+            "name": name,
+            "boy_price": float(boy_price),
+            "girl_price": float(girl_price),
+            "remaining": int(remaining),
+        }
 
     def total_remaining(self, event: Event) -> int:
         return event.early_bird_qty + event.regular_tier1_qty + event.regular_tier2_qty
@@ -748,10 +1486,9 @@ class Database:
         group_discount_amount = float(plan["group_discount_amount"])
         applied_discount_amount = self._applied_discount_amount(group_discount_amount, discount_amount)
         total_price = max(0.0, base_total_price - applied_discount_amount)
-        code = f"R{event_id}-{uuid.uuid4().hex[:8].upper()}"
+        code = self._reservation_code("R", event_id)
         repost_proofs = repost_proofs_by_index or {}
 
-        cursor = self.conn.cursor()
         reservation_cols = self._table_columns("reservations")
         avg_price = (total_price / quantity) if quantity > 0 else 0.0
         insert_values = {
@@ -797,129 +1534,107 @@ class Database:
         if "hold_applied" in reservation_cols:
             insert_values["hold_applied"] = 1
 
-        columns = list(insert_values.keys())
-        placeholders = ", ".join(["?"] * len(columns))
-        cursor.execute(
-            f"INSERT INTO reservations ({', '.join(columns)}) VALUES ({placeholders})",
-            tuple(insert_values[column] for column in columns),
-        )
-        reservation_id = cursor.lastrowid
-
-        for attendee_index, full_name in enumerate(attendees):
-            attendee_plan = plan["attendee_allocations"][attendee_index]
-            attendee_gender = attendee_plan["gender"]
-            attendee_tier = attendee_plan["tier_key"]
-            first_name, surname = self._name_parts("", "", full_name)
-            repost_discount_applied = 1 if attendee_index in discounted_indexes else 0
-            repost_proof_file_id = ""
-            repost_proof_file_type = ""
-            if repost_discount_applied:
-                repost_proof_file_id, repost_proof_file_type = repost_proofs.get(attendee_index, ("", ""))
-            cursor.execute(
-                """
-                INSERT INTO attendees (
-                    reservation_id, name, surname, full_name, gender,
-                    repost_discount_applied, repost_proof_file_id, repost_proof_file_type, ticket_tier
+        with self._write_transaction():
+            cursor = self._cursor()
+            for tier_key, tier_qty in plan["hold_counts"].items():
+                if not self._apply_tier_hold(cursor, event_id, tier_key, tier_qty):
+                    raise ValueError("Not enough tickets remaining across all tiers")
+            reservation = self._insert_reservation_returning(cursor, insert_values)
+
+            attendee_params = []
+            for attendee_index, (full_name, allocation) in enumerate(zip(attendees, plan["attendee_allocations"])):
+                repost_proof_file_id, repost_proof_file_type = "", ""
+                repost_discount_applied = 1 if attendee_index in discounted_indexes else 0
+                if repost_discount_applied:
+                    repost_proof_file_id, repost_proof_file_type = repost_proofs.get(attendee_index, ("", ""))
+                attendee_params.append(
+                    (
+                        reservation.id,
+                        *self._name_parts("", "", full_name),
+                        full_name,
+                        allocation.gender,
+                        repost_discount_applied,
+                        repost_proof_file_id,
+                        repost_proof_file_type,
+                        allocation.tier_key,
+                    )
                 )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    reservation_id,
-                    first_name,
-                    surname,
-                    full_name,
-                    attendee_gender,
-                    repost_discount_applied,
-                    repost_proof_file_id,
-                    repost_proof_file_type,
-                    attendee_tier,
-                ),
-            )
-
-        hold_counts = plan["hold_counts"]
-        for tier_key, tier_qty in hold_counts.items():
-            qty_column = self._tier_qty_column(tier_key)
-            cursor.execute(
-                f"UPDATE events SET {qty_column} = {qty_column} - ? WHERE id = ? AND {qty_column} >= ?",
-                (int(tier_qty), event_id, int(tier_qty)),
-            )
-            if cursor.rowcount <= 0:
-                self.conn.rollback()
-                raise ValueError("Not enough tickets remaining across all tiers")
+            cursor.executemany(_INSERT_ATTENDEE_SQL, attendee_params)
 
-        self.conn.commit()
-        return self.get_reservation(reservation_id)
+        return reservation
 
     def get_reservation(self, reservation_id: int) -> Reservation:
-        cursor = self.conn.cursor()
-        cursor.execute(
-            """
-            SELECT id, code, user_id, event_id, ticket_type, quantity,
-                   total_price, base_total_price, girls_group_free_count, boys_group_free_count,
-                   girls_group_discount_amount, boys_group_discount_amount, group_discount_amount,
-                   discount_count, discount_unit_amount, discount_amount,
-                   boys, girls, status, created_at,
-                   payment_file_id, payment_file_type, admin_note,
-                   reviewed_at, reviewed_by_tg_id, hold_applied
-            FROM reservations
-            WHERE id = ?
-            """,
-            (reservation_id,),
-        )
+        cursor = self._read_cursor()
+        cursor.execute(_GET_RESERVATION_SQL, (reservation_id,))
         row = cursor.fetchone()
-        return Reservation(**dict(row))
+        return Reservation.from_row(row)
 
     def get_reservation_by_code(self, reservation_code: str) -> Optional[Reservation]:
-        cursor = self.conn.cursor()
-        cursor.execute(
-            """
-            SELECT id, code, user_id, event_id, ticket_type, quantity,
-                   total_price, base_total_price, girls_group_free_count, boys_group_free_count,
-                   girls_group_discount_amount, boys_group_discount_amount, group_discount_amount,
-                   discount_count, discount_unit_amount, discount_amount,
-                   boys, girls, status, created_at,
-                   payment_file_id, payment_file_type, admin_note,
-                   reviewed_at, reviewed_by_tg_id, hold_applied
-            FROM reservations
-            WHERE code = ?
-            """,
-            (reservation_code,),
-        )
+        cursor = self._read_cursor()
+        cursor.execute(_GET_RESERVATION_BY_CODE_SQL, (reservation_code,))
         row = cursor.fetchone()
-        return Reservation(**dict(row)) if row else None
+        return Reservation.from_row(row) if row else None
 
     def list_reservations_for_user(self, user_id: int) -> List[Reservation]:
-        cursor = self.conn.cursor()
+        cursor = self._read_connection().cursor()
+        cursor.row_factory = None
+        cursor.execute(_LIST_USER_RESERVATIONS_SQL, (user_id,))
+        return [Reservation.from_row(row) for row in cursor.fetchall()]
+
+    def list_reservations_with_attendees(self, user_id: int) -> List[Tuple[Reservation, List[Dict[str, Any]]]]:
+        cursor = self._read_connection().cursor()
+        cursor.row_factory = None
         cursor.execute(
             """
-            SELECT id, code, user_id, event_id, ticket_type, quantity,
-                   total_price, base_total_price, girls_group_free_count, boys_group_free_count,
-                   girls_group_discount_amount, boys_group_discount_amount, group_discount_amount,
-                   discount_count, discount_unit_amount, discount_amount,
-                   boys, girls, status, created_at,
-                   payment_file_id, payment_file_type, admin_note,
-                   reviewed_at, reviewed_by_tg_id, hold_applied
-            FROM reservations
-            WHERE user_id = ?
-            ORDER BY created_at DESC
+            SELECT r.id, r.code, r.user_id, r.event_id, r.ticket_type, r.quantity,
+                   r.total_price, r.base_total_price, r.girls_group_free_count, r.boys_group_free_count,
+                   r.girls_group_discount_amount, r.boys_group_discount_amount, r.group_discount_amount,
+                   r.discount_count, r.discount_unit_amount, r.discount_amount,
+                   r.boys, r.girls, r.status, r.created_at,
+                   r.payment_file_id, r.payment_file_type, r.admin_note,
+                   r.reviewed_at, r.reviewed_by_tg_id, r.hold_applied,
+                   a.id, a.reservation_id, a.name, a.surname, a.full_name, a.gender,
+                   a.repost_discount_applied, a.repost_proof_file_id, a.repost_proof_file_type,
+                   a.ticket_tier, a.status
+            FROM reservations r
+            LEFT JOIN attendees a ON a.reservation_id = r.id
+            WHERE r.user_id = ?
+            ORDER BY r.created_at DESC, r.id DESC, a.id
             """,
             (user_id,),
         )
-        return [Reservation(**dict(row)) for row in cursor.fetchall()]
+        items: List[Tuple[Reservation, List[Dict[str, Any]]]] = []
+        for _reservation_id, rows in groupby(cursor.fetchall(), key=lambda row: row[0]):
+            rows = list(rows)
+            reservation = Reservation.from_row(rows[0][:_RESERVATION_FIELD_COUNT])
+            attendees = [
+                dict(zip(_ATTENDEE_FIELDS, row[_RESERVATION_FIELD_COUNT:]))
+                for row in rows
+                if row[_RESERVATION_FIELD_COUNT] is not None
+            ]
+            items.append((reservation, attendees))
+        return items
+
+    def list_user_tickets(self, user_id: int, limit: int) -> List[Tuple[Reservation, Optional[str], List[str]]]:
+        cursor = self._read_connection().cursor()
+        cursor.row_factory = None
+        cursor.execute(_LIST_USER_TICKETS_SQL, (user_id, limit))
+        rows = cursor.fetchall()
+        if not rows:
+            return []
+        cursor.execute(_LIST_TICKET_ATTENDEE_NAMES_SQL, (json.dumps([row[0] for row in rows]),))
+        names = {
+            reservation_id: [name for _reservation_id, name in group]
+            for reservation_id, group in groupby(cursor.fetchall(), key=lambda row: row[0])
+        }
+        return [
+            (Reservation.from_row(row[:_RESERVATION_FIELD_COUNT]), row[_RESERVATION_FIELD_COUNT], names.get(row[0], []))
+            for row in rows
+        ]
 
     def list_attendees(self, reservation_id: int) -> List[sqlite3.Row]:
-        cursor = self.conn.cursor()
-        cursor.execute(
-            """
-            SELECT id, reservation_id, name, surname, full_name, gender,
-                   repost_discount_applied, repost_proof_file_id, repost_proof_file_type,
-                   ticket_tier, status
-            FROM attendees
-            WHERE reservation_id = ?
-            ORDER BY id
-            """,
-            (reservation_id,),
-        )
+        cursor = self._read_cursor()
+        cursor.execute(_LIST_ATTENDEES_SQL, (reservation_id,))
         return cursor.fetchall()
 
     def _reservation_row_by_code(self, reservation_code: str, cursor: sqlite3.Cursor) -> Optional[sqlite3.Row]:
@@ -950,24 +1665,32 @@ class Database:
         base_total_price = float(reservation_row["base_total_price"] or reservation_row["total_price"] or 0)
         return (base_total_price / quantity) if quantity > 0 else 0.0
 
-    def _update_legacy_reservation_fields(
+    def _update_reservation_totals(
         self,
         cursor: sqlite3.Cursor,
         reservation_id: int,
-        reservation_cols: set,
-        quantity: int,
-        total_price: float,
+        totals: Dict[str, Any],
+        extra_fields: Optional[Dict[str, Any]] = None,
     ) -> None:
-        updates: Dict[str, Any] = {}
+        updates = {field: totals[field] for field in _RESERVATION_TOTAL_FIELDS}
+        if extra_fields:
+            updates.update(extra_fields)
+        reservation_cols = self._table_columns("reservations")
+        quantity = updates["quantity"]
         if "price_per_ticket" in reservation_cols:
-            updates["price_per_ticket"] = (total_price / quantity) if quantity > 0 else 0.0
+            updates["price_per_ticket"] = (updates["total_price"] / quantity) if quantity > 0 else 0.0
         if "paid_tickets" in reservation_cols:
             updates["paid_tickets"] = quantity
-        if not updates:
-            return
         assignments = ", ".join([f"{col} = ?" for col in updates.keys()])
-        params = list(updates.values()) + [reservation_id]
-        cursor.execute(f"UPDATE reservations SET {assignments} WHERE id = ?", tuple(params))
+        cursor.execute(f"UPDATE reservations SET {assignments} WHERE id = ?", (*updates.values(), reservation_id))
+
+    def _joined_event(self, row: sqlite3.Row) -> Optional[Event]:
+        event_values = row[-len(_EVENT_COLUMNS):]
+        return Event.from_row(event_values) if event_values[0] is not None else None
+
+    def _updated_reservation(self, row: sqlite3.Row, updates: Optional[Dict[str, Any]] = None) -> Reservation:
+        updates = updates or {}
+        return Reservation(**{column: updates.get(column, row[column]) for column in _RESERVATION_COLUMNS})
 
     def _reservation_attendee_rows(self, reservation_id: int, cursor: sqlite3.Cursor) -> List[sqlite3.Row]:
         cursor.execute(
@@ -991,7 +1714,7 @@ class Database:
         attendee_rows: List[sqlite3.Row],
         event: Event,
     ) -> Dict[str, Any]:
-        attendee_allocations: List[Dict[str, Any]] = []
+        attendee_allocations: List[TierAllocation] = []
         boys = 0
         girls = 0
         repost_discount_count = 0
@@ -1007,19 +1730,19 @@ class Database:
                 repost_discount_count += 1
             if gender in {"boy", "girl"} and ticket_tier in {"early", "tier1", "tier2"}:
                 attendee_allocations.append(
-                    {
-                        "gender": gender,
-                        "tier_key": ticket_tier,
-                        "unit_price": self._reservation_unit_price(
+                    TierAllocation(
+                        ticket_tier,
+                        gender,
+                        self._reservation_unit_price(
                             reservation_row,
                             event,
                             gender,
                             attendee_tier=ticket_tier,
                         ),
-                    }
+                    )
                 )
 
-        base_total_price = sum(float(item["unit_price"]) for item in attendee_allocations)
+        base_total_price = sum(item.unit_price for item in attendee_allocations)
         (
             girls_group_free_count,
             girls_group_discount_amount,
@@ -1056,80 +1779,35 @@ class Database:
         if gender is None:
             return False, "Gender must be boy or girl.", None
 
-        cursor = self.conn.cursor()
-        reservation_row = self._reservation_row_by_code(reservation_code, cursor)
-        if not reservation_row:
-            return False, "Reservation code not found.", None
-        if not self._is_admin_mutable_reservation_status(reservation_row["status"]):
-            return False, "Guest can be added only to pending/approved reservations.", None
-
-        event = self.get_event(reservation_row["event_id"])
-        if not event:
-            return False, "Event not found for reservation.", None
-
-        try:
-            add_plan = self._allocate_tier_plan(event, 1 if gender == "boy" else 0, 1 if gender == "girl" else 0)
-        except ValueError:
-            return False, "No tickets left across all tiers for adding guest.", None
-        attendee_tier = add_plan["attendee_allocations"][0]["tier_key"]
-        add_price = float(add_plan["attendee_allocations"][0]["unit_price"])
-        qty_column = self._tier_qty_column(attendee_tier)
-        if reservation_row["hold_applied"] == 1:
-            cursor.execute(
-                f"UPDATE events SET {qty_column} = {qty_column} - 1 WHERE id = ? AND {qty_column} > 0",
-                (reservation_row["event_id"],),
-            )
-            if cursor.rowcount == 0:
-                self.conn.rollback()
+        with self._write_transaction():
+            cursor = self._cursor()
+            reservation_row = self._reservation_row_by_code(reservation_code, cursor)
+            if not reservation_row:
+                return False, "Reservation code not found.", None
+            if not self._is_admin_mutable_reservation_status(reservation_row["status"]):
+                return False, "Guest can be added only to pending/approved reservations.", None
+
+            event = self.get_event(reservation_row["event_id"])
+            if not event:
+                return False, "Event not found for reservation.", None
+
+            try:
+                add_plan = self._allocate_tier_plan(event, 1 if gender == "boy" else 0, 1 if gender == "girl" else 0)
+            except ValueError:
                 return False, "No tickets left across all tiers for adding guest.", None
-        cursor.execute(
-            """
-            INSERT INTO attendees (
-                reservation_id, name, surname, full_name, gender,
-                repost_discount_applied, repost_proof_file_id, repost_proof_file_type, ticket_tier
+            attendee_tier = add_plan["attendee_allocations"][0].tier_key
+            if reservation_row["hold_applied"] == 1:
+                if not self._apply_tier_hold(cursor, reservation_row["event_id"], attendee_tier, 1):
+                    return False, "No tickets left across all tiers for adding guest.", None
+            cursor.execute(
+                _INSERT_ATTENDEE_SQL,
+                (reservation_row["id"], *self._name_parts("", "", full_name), full_name, gender, 0, "", "", attendee_tier),
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (reservation_row["id"], *self._name_parts("", "", full_name), full_name, gender, 0, "", "", attendee_tier),
-        )
-        attendee_rows = self._reservation_attendee_rows(int(reservation_row["id"]), cursor)
-        totals = self._recalculate_reservation_totals(reservation_row, attendee_rows, event)
-        cursor.execute(
-            """
-            UPDATE reservations
-            SET quantity = ?, boys = ?, girls = ?, total_price = ?, base_total_price = ?,
-                girls_group_free_count = ?, boys_group_free_count = ?,
-                girls_group_discount_amount = ?, boys_group_discount_amount = ?, group_discount_amount = ?,
-                discount_count = ?, discount_amount = ?
-            WHERE id = ?
-            """,
-            (
-                totals["quantity"],
-                totals["boys"],
-                totals["girls"],
-                totals["total_price"],
-                totals["base_total_price"],
-                totals["girls_group_free_count"],
-                totals["boys_group_free_count"],
-                totals["girls_group_discount_amount"],
-                totals["boys_group_discount_amount"],
-                totals["group_discount_amount"],
-                totals["discount_count"],
-                totals["discount_amount"],
-                reservation_row["id"],
-            ),
-        )
-        reservation_cols = self._table_columns("reservations")
-        self._update_legacy_reservation_fields(
-            cursor=cursor,
-            reservation_id=reservation_row["id"],
-            reservation_cols=reservation_cols,
-            quantity=totals["quantity"],
-            total_price=totals["total_price"],
-        )
-        self.conn.commit()
-        updated = self.get_reservation(reservation_row["id"])
-        return True, "Guest added successfully.", updated
+            attendee_rows = self._reservation_attendee_rows(int(reservation_row["id"]), cursor)
+            totals = self._recalculate_reservation_totals(reservation_row, attendee_rows, event)
+            self._update_reservation_totals(cursor, reservation_row["id"], totals)
+            updated = self._updated_reservation(reservation_row, totals)
+            return True, "Guest added successfully.", updated
 
     def admin_add_guest_by_event(
         self,
@@ -1158,33 +1836,81 @@ class Database:
             return False, "Event is sold out.", None
 
         price = float(active_tier["boy_price"] if gender == "boy" else active_tier["girl_price"])
-        code = f"A{event_id}-{uuid.uuid4().hex[:8].upper()}"
+        code = self._reservation_code("A", event_id)
         quantity = 1
         boys = 1 if gender == "boy" else 0
         girls = 1 if gender == "girl" else 0
         full_name = f"{clean_name} {clean_surname}".strip()
 
-        cursor = self.conn.cursor()
-        user_id = self._ensure_user_for_tg(admin_tg_id, cursor)
+        with self._write_transaction():
+            cursor = self._cursor()
+            if not self._apply_tier_hold(cursor, event_id, active_tier["key"], 1):
+                return False, "No tickets left in current tier.", None
+            user_id = self._ensure_user_for_tg(admin_tg_id, cursor)
 
-        qty_column = self._tier_qty_column(active_tier["key"])
-        cursor.execute(
-            f"UPDATE events SET {qty_column} = {qty_column} - 1 WHERE id = ? AND {qty_column} > 0",
-            (event_id,),
-        )
-        if cursor.rowcount <= 0:
-            self.conn.rollback()
-            return False, "No tickets left in current tier.", None
+            reservation_cols = self._table_columns("reservations")
+            insert_values: Dict[str, Any] = {
+                "code": code,
+                "user_id": user_id,
+                "event_id": event_id,
+                "ticket_type": active_tier["key"],
+                "quantity": quantity,
+                "total_price": price,
+                "base_total_price": price,
+                "girls_group_free_count": 0,
+                "boys_group_free_count": 0,
+                "girls_group_discount_amount": 0.0,
+                "boys_group_discount_amount": 0.0,
+                "group_discount_amount": 0.0,
+                "discount_count": 0,
+                "discount_unit_amount": 0.0,
+                "discount_amount": 0.0,
+                "boys": boys,
+                "girls": girls,
+                "status": STATUS_APPROVED,
+                "created_at": self._utc_now(),
+            }
+            if "price_per_ticket" in reservation_cols:
+                insert_values["price_per_ticket"] = price
+            if "paid_tickets" in reservation_cols:
+                insert_values["paid_tickets"] = quantity
+            if "credit_used_tickets" in reservation_cols:
+                insert_values["credit_used_tickets"] = 0
+            if "credit_source_codes" in reservation_cols:
+                insert_values["credit_source_codes"] = ""
+            if "payment_file_id" in reservation_cols:
+                insert_values["payment_file_id"] = ""
+            if "payment_file_type" in reservation_cols:
+                insert_values["payment_file_type"] = ""
+            if "admin_note" in reservation_cols:
+                insert_values["admin_note"] = "Added by admin dashboard"
+            if "reviewed_at" in reservation_cols:
+                insert_values["reviewed_at"] = self._utc_now()
+            if "reviewed_by_tg_id" in reservation_cols:
+                insert_values["reviewed_by_tg_id"] = admin_tg_id
+            if "hold_applied" in reservation_cols:
+                insert_values["hold_applied"] = 1
+
+            reservation = self._insert_reservation_returning(cursor, insert_values)
+            cursor.execute(
+                """
+                INSERT INTO attendees (reservation_id, name, surname, full_name, gender, ticket_tier)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (reservation.id, clean_name, clean_surname, full_name, gender, active_tier["key"]),
+            )
+            return True, "Guest added successfully.", reservation
 
+    def _imported_reservation_values(self, code: str, user_id: int, event_id: int, admin_tg_id: int) -> Dict[str, Any]:
         reservation_cols = self._table_columns("reservations")
         insert_values: Dict[str, Any] = {
             "code": code,
             "user_id": user_id,
             "event_id": event_id,
-            "ticket_type": active_tier["key"],
-            "quantity": quantity,
-            "total_price": price,
-            "base_total_price": price,
+            "ticket_type": "",
+            "quantity": 1,
+            "total_price": 0.0,
+            "base_total_price": 0.0,
             "girls_group_free_count": 0,
             "boys_group_free_count": 0,
             "girls_group_discount_amount": 0.0,
@@ -1193,15 +1919,15 @@ class Database:
             "discount_count": 0,
             "discount_unit_amount": 0.0,
             "discount_amount": 0.0,
-            "boys": boys,
-            "girls": girls,
+            "boys": 0,
+            "girls": 0,
             "status": STATUS_APPROVED,
             "created_at": self._utc_now(),
         }
         if "price_per_ticket" in reservation_cols:
-            insert_values["price_per_ticket"] = price
+            insert_values["price_per_ticket"] = 0.0
         if "paid_tickets" in reservation_cols:
-            insert_values["paid_tickets"] = quantity
+            insert_values["paid_tickets"] = 1
         if "credit_used_tickets" in reservation_cols:
             insert_values["credit_used_tickets"] = 0
         if "credit_source_codes" in reservation_cols:
@@ -1211,30 +1937,14 @@ class Database:
         if "payment_file_type" in reservation_cols:
             insert_values["payment_file_type"] = ""
         if "admin_note" in reservation_cols:
-            insert_values["admin_note"] = "Added by admin dashboard"
+            insert_values["admin_note"] = "Imported from Excel"
         if "reviewed_at" in reservation_cols:
             insert_values["reviewed_at"] = self._utc_now()
         if "reviewed_by_tg_id" in reservation_cols:
             insert_values["reviewed_by_tg_id"] = admin_tg_id
         if "hold_applied" in reservation_cols:
-            insert_values["hold_applied"] = 1
-
-        columns = list(insert_values.keys())
-        placeholders = ", ".join(["?"] * len(columns))
-        cursor.execute(
-            f"INSERT INTO reservations ({', '.join(columns)}) VALUES ({placeholders})",
-            tuple(insert_values[col] for col in columns),
-        )
-        reservation_id = int(cursor.lastrowid)
-        cursor.execute(
-            """
-            INSERT INTO attendees (reservation_id, name, surname, full_name, gender, ticket_tier)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            (reservation_id, clean_name, clean_surname, full_name, gender, active_tier["key"]),
-        )
-        self.conn.commit()
-        return True, "Guest added successfully.", self.get_reservation(reservation_id)
+            insert_values["hold_applied"] = 0
+        return insert_values
 
     def admin_import_guest_by_event(
         self,
@@ -1253,176 +1963,109 @@ class Database:
             return False, "Event not found.", None
 
         full_name = f"{clean_name} {clean_surname}".strip()
-        code = f"I{event_id}-{uuid.uuid4().hex[:8].upper()}"
-        cursor = self.conn.cursor()
-        user_id = self._ensure_user_for_tg(admin_tg_id, cursor)
-
-        reservation_cols = self._table_columns("reservations")
-        insert_values: Dict[str, Any] = {
-            "code": code,
-            "user_id": user_id,
-            "event_id": event_id,
-            "ticket_type": "",
-            "quantity": 1,
-            "total_price": 0.0,
-            "base_total_price": 0.0,
-            "girls_group_free_count": 0,
-            "boys_group_free_count": 0,
-            "girls_group_discount_amount": 0.0,
-            "boys_group_discount_amount": 0.0,
-            "group_discount_amount": 0.0,
-            "discount_count": 0,
-            "discount_unit_amount": 0.0,
-            "discount_amount": 0.0,
-            "boys": 0,
-            "girls": 0,
-            "status": STATUS_APPROVED,
-            "created_at": self._utc_now(),
-        }
-        if "price_per_ticket" in reservation_cols:
-            insert_values["price_per_ticket"] = 0.0
-        if "paid_tickets" in reservation_cols:
-            insert_values["paid_tickets"] = 1
-        if "credit_used_tickets" in reservation_cols:
-            insert_values["credit_used_tickets"] = 0
-        if "credit_source_codes" in reservation_cols:
-            insert_values["credit_source_codes"] = ""
-        if "payment_file_id" in reservation_cols:
-            insert_values["payment_file_id"] = ""
-        if "payment_file_type" in reservation_cols:
-            insert_values["payment_file_type"] = ""
-        if "admin_note" in reservation_cols:
-            insert_values["admin_note"] = "Imported from Excel"
-        if "reviewed_at" in reservation_cols:
-            insert_values["reviewed_at"] = self._utc_now()
-        if "reviewed_by_tg_id" in reservation_cols:
-            insert_values["reviewed_by_tg_id"] = admin_tg_id
-        if "hold_applied" in reservation_cols:
-            insert_values["hold_applied"] = 0
-
-        columns = list(insert_values.keys())
-        placeholders = ", ".join(["?"] * len(columns))
-        cursor.execute(
-            f"INSERT INTO reservations ({', '.join(columns)}) VALUES ({placeholders})",
-            tuple(insert_values[col] for col in columns),
-        )
-        reservation_id = int(cursor.lastrowid)
-        cursor.execute(
-            """
-            INSERT INTO attendees (reservation_id, name, surname, full_name, gender, ticket_tier)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            (reservation_id, clean_name, clean_surname, full_name, "unknown", ""),
-        )
-        self.conn.commit()
-        return True, "Guest imported successfully.", self.get_reservation(reservation_id)
+        code = self._reservation_code("I", event_id)
+        with self._write_transaction():
+            cursor = self._cursor()
+            user_id = self._ensure_user_for_tg(admin_tg_id, cursor)
+            insert_values = self._imported_reservation_values(code, user_id, event_id, admin_tg_id)
+            reservation = self._insert_reservation_returning(cursor, insert_values)
+            cursor.execute(
+                """
+                INSERT INTO attendees (reservation_id, name, surname, full_name, gender, ticket_tier)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (reservation.id, clean_name, clean_surname, full_name, "unknown", ""),
+            )
+            return True, "Guest imported successfully.", reservation
 
-    def admin_remove_guest(self, attendee_id: int) -> Tuple[bool, str, Optional[Reservation]]:
-        cursor = self.conn.cursor()
-        cursor.execute(
-            """
-            SELECT
-                a.id AS attendee_id,
-                a.full_name,
-                COALESCE(a.gender, 'unknown') AS gender,
-                COALESCE(a.repost_discount_applied, 0) AS repost_discount_applied,
-                COALESCE(a.ticket_tier, '') AS attendee_tier,
-                r.*
-            FROM attendees a
-            JOIN reservations r ON r.id = a.reservation_id
-            WHERE a.id = ?
-            """,
-            (attendee_id,),
-        )
-        row = cursor.fetchone()
-        if not row:
-            return False, "Attendee not found.", None
-        normalized_status = (row["status"] or "").strip().lower()
-        if not self._is_admin_mutable_reservation_status(row["status"]):
-            return False, "Guest can be removed only from pending/approved/rejected reservations.", None
+    def admin_import_guests_by_event(
+        self,
+        admin_tg_id: int,
+        event_id: int,
+        rows: List[Tuple[str, str]],
+    ) -> Tuple[bool, str, int]:
+        names = []
+        for name, surname in rows:
+            clean_name = (name or "").strip()
+            clean_surname = (surname or "").strip()
+            if not clean_name:
+                return False, "Name is required.", 0
+            names.append((clean_name, clean_surname))
+        if not names:
+            return True, "Nothing to import.", 0
 
-        event = self.get_event(row["event_id"])
+        event = self.get_event(event_id)
         if not event:
-            return False, "Event not found for reservation.", None
-
-        new_quantity = int(row["quantity"]) - 1
-        cursor.execute("DELETE FROM attendees WHERE id = ?", (attendee_id,))
+            return False, "Event not found.", 0
+
+        with self._write_transaction():
+            cursor = self._cursor()
+            codes = self._fresh_reservation_codes(cursor, "I", event_id, len(names))
+            guests = [(code, name, surname) for code, (name, surname) in zip(codes, names)]
+            user_id = self._ensure_user_for_tg(admin_tg_id, cursor)
+            reservation_params = []
+            insert_sql = ""
+            for code, _name, _surname in guests:
+                insert_values = self._imported_reservation_values(code, user_id, event_id, admin_tg_id)
+                insert_sql = self._reservation_insert_statement(tuple(insert_values))
+                reservation_params.append(tuple(insert_values.values()))
+            cursor.executemany(insert_sql, reservation_params)
 
-        if row["hold_applied"] == 1:
-            release_tier = row["attendee_tier"] if row["attendee_tier"] in {"early", "tier1", "tier2"} else row["ticket_type"]
-            qty_column = self._tier_qty_column(release_tier)
-            cursor.execute(
-                f"UPDATE events SET {qty_column} = {qty_column} + 1 WHERE id = ?",
-                (row["event_id"],),
-            )
-
-        if new_quantity <= 0:
-            if normalized_status == STATUS_REJECTED:
-                cursor.execute("DELETE FROM reservations WHERE id = ?", (row["id"],))
-                self.conn.commit()
-                return True, "Rejected guest removed and reservation deleted.", None
             cursor.execute(
                 """
-                UPDATE reservations
-                SET quantity = 0, boys = 0, girls = 0, total_price = 0, base_total_price = 0,
-                    girls_group_free_count = 0, boys_group_free_count = 0,
-                    girls_group_discount_amount = 0, boys_group_discount_amount = 0, group_discount_amount = 0,
-                    discount_count = 0, discount_amount = 0,
-                    status = ?, hold_applied = 0
-                WHERE id = ?
+                SELECT code, id FROM reservations
+                WHERE event_id = ? AND code IN (SELECT value FROM json_each(?))
                 """,
-                (STATUS_CANCELLED, row["id"]),
+                (event_id, json.dumps([code for code, _name, _surname in guests])),
             )
-            reservation_cols = self._table_columns("reservations")
-            self._update_legacy_reservation_fields(
-                cursor=cursor,
-                reservation_id=row["id"],
-                reservation_cols=reservation_cols,
-                quantity=0,
-                total_price=0.0,
+            reservation_ids = dict(cursor.fetchall())
+            cursor.executemany(
+                """
+                INSERT INTO attendees (reservation_id, name, surname, full_name, gender, ticket_tier)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (reservation_ids[code], name, surname, f"{name} {surname}".strip(), "unknown", "")
+                    for code, name, surname in guests
+                ],
             )
-            self.conn.commit()
-            updated = self.get_reservation(row["id"])
-            return True, "Guest removed and reservation cancelled.", updated
+        return True, "Guests imported successfully.", len(guests)
 
-        attendee_rows = self._reservation_attendee_rows(int(row["id"]), cursor)
-        totals = self._recalculate_reservation_totals(row, attendee_rows, event)
-        cursor.execute(
-            """
-            UPDATE reservations
-            SET quantity = ?, boys = ?, girls = ?, total_price = ?, base_total_price = ?,
-                girls_group_free_count = ?, boys_group_free_count = ?,
-                girls_group_discount_amount = ?, boys_group_discount_amount = ?, group_discount_amount = ?,
-                discount_count = ?, discount_amount = ?
-            WHERE id = ?
-            """,
-            (
-                totals["quantity"],
-                totals["boys"],
-                totals["girls"],
-                totals["total_price"],
-                totals["base_total_price"],
-                totals["girls_group_free_count"],
-                totals["boys_group_free_count"],
-                totals["girls_group_discount_amount"],
-                totals["boys_group_discount_amount"],
-                totals["group_discount_amount"],
-                totals["discount_count"],
-                totals["discount_amount"],
-                row["id"],
-            ),
-        )
-        reservation_cols = self._table_columns("reservations")
-        self._update_legacy_reservation_fields(
-            cursor=cursor,
-            reservation_id=row["id"],
-            reservation_cols=reservation_cols,
-            quantity=totals["quantity"],
-            total_price=totals["total_price"],
-        )
-        self.conn.commit()
-        updated = self.get_reservation(row["id"])
-        return True, "Guest removed successfully.", updated
+    def admin_remove_guest(self, attendee_id: int) -> Tuple[bool, str, Optional[Reservation]]:
+        with self._write_transaction():
+            cursor = self._cursor()
+            cursor.execute(_REMOVE_GUEST_BY_ID_SQL, (attendee_id,))
+            row = cursor.fetchone()
+            if not row:
+                return False, "Attendee not found.", None
+            normalized_status = (row["status"] or "").strip().lower()
+            if not self._is_admin_mutable_reservation_status(row["status"]):
+                return False, "Guest can be removed only from pending/approved/rejected reservations.", None
+
+            event = self._joined_event(row)
+            if not event:
+                return False, "Event not found for reservation.", None
+
+            new_quantity = int(row["quantity"]) - 1
+            cursor.execute("DELETE FROM attendees WHERE id = ?", (attendee_id,))
+
+            if row["hold_applied"] == 1:
+                release_tier = row["attendee_tier"] if row["attendee_tier"] in {"early", "tier1", "tier2"} else row["ticket_type"]
+                self._release_tier_hold(cursor, row["event_id"], release_tier, 1)
+
+            if new_quantity <= 0:
+                if normalized_status == STATUS_REJECTED:
+                    cursor.execute("DELETE FROM reservations WHERE id = ?", (row["id"],))
+                    return True, "Rejected guest removed and reservation deleted.", None
+                cancelled_fields = {"status": STATUS_CANCELLED, "hold_applied": 0}
+                self._update_reservation_totals(cursor, row["id"], _EMPTY_RESERVATION_TOTALS, cancelled_fields)
+                updated = self._updated_reservation(row, {**_EMPTY_RESERVATION_TOTALS, **cancelled_fields})
+                return True, "Guest removed and reservation cancelled.", updated
+
+            attendee_rows = self._reservation_attendee_rows(int(row["id"]), cursor)
+            totals = self._recalculate_reservation_totals(row, attendee_rows, event)
+            self._update_reservation_totals(cursor, row["id"], totals)
+            return True, "Guest removed successfully.", self._updated_reservation(row, totals)
 
     def admin_remove_guest_by_name(
         self,
@@ -1436,124 +2079,47 @@ class Database:
             return False, "Both name and surname are required.", None
 
         full_name = f"{clean_name} {clean_surname}".strip()
-        cursor = self.conn.cursor()
-        cursor.execute(
-            """
-            SELECT
-                a.id AS attendee_id,
-                a.full_name,
-                COALESCE(a.gender, 'unknown') AS gender,
-                COALESCE(a.repost_discount_applied, 0) AS repost_discount_applied,
-                COALESCE(a.ticket_tier, '') AS attendee_tier,
-                r.*
-            FROM attendees a
-            JOIN reservations r ON r.id = a.reservation_id
-            WHERE r.event_id = ?
-              AND LOWER(TRIM(r.status)) IN (?, ?, ?, ?, ?, ?, ?)
-              AND (
-                    LOWER(TRIM(a.full_name)) = LOWER(TRIM(?))
-                    OR (LOWER(TRIM(a.name)) = LOWER(TRIM(?)) AND LOWER(TRIM(a.surname)) = LOWER(TRIM(?)))
-              )
-            ORDER BY a.id DESC
-            LIMIT 1
-            """,
-            (
-                event_id,
-                STATUS_PENDING,
-                STATUS_APPROVED,
-                STATUS_REJECTED,
-                "pending",
-                "pending_payment",
-                "pending_review",
-                "pending_payment_approval",
-                full_name,
-                clean_name,
-                clean_surname,
-            ),
-        )
-        row = cursor.fetchone()
-        if not row:
-            return False, "Guest not found for selected event.", None
-        normalized_status = (row["status"] or "").strip().lower()
-
-        event = self.get_event(row["event_id"])
-        if not event:
-            return False, "Event not found for reservation.", None
-
-        new_quantity = int(row["quantity"]) - 1
-        cursor.execute("DELETE FROM attendees WHERE id = ?", (row["attendee_id"],))
-        if row["hold_applied"] == 1:
-            release_tier = row["attendee_tier"] if row["attendee_tier"] in {"early", "tier1", "tier2"} else row["ticket_type"]
-            qty_column = self._tier_qty_column(release_tier)
-            cursor.execute(
-                f"UPDATE events SET {qty_column} = {qty_column} + 1 WHERE id = ?",
-                (row["event_id"],),
-            )
-
-        if new_quantity <= 0:
-            if normalized_status == STATUS_REJECTED:
-                cursor.execute("DELETE FROM reservations WHERE id = ?", (row["id"],))
-                self.conn.commit()
-                return True, "Rejected guest removed and reservation deleted.", None
-            cursor.execute(
-                """
-                UPDATE reservations
-                SET quantity = 0, boys = 0, girls = 0, total_price = 0, base_total_price = 0,
-                    girls_group_free_count = 0, boys_group_free_count = 0,
-                    girls_group_discount_amount = 0, boys_group_discount_amount = 0, group_discount_amount = 0,
-                    discount_count = 0, discount_amount = 0,
-                    status = ?, hold_applied = 0
-                WHERE id = ?
-                """,
-                (STATUS_CANCELLED, row["id"]),
-            )
-            reservation_cols = self._table_columns("reservations")
-            self._update_legacy_reservation_fields(
-                cursor=cursor,
-                reservation_id=row["id"],
-                reservation_cols=reservation_cols,
-                quantity=0,
-                total_price=0.0,
-            )
-        else:
-            attendee_rows = self._reservation_attendee_rows(int(row["id"]), cursor)
-            totals = self._recalculate_reservation_totals(row, attendee_rows, event)
+        with self._write_transaction():
+            cursor = self._cursor()
             cursor.execute(
-                """
-                UPDATE reservations
-                SET quantity = ?, boys = ?, girls = ?, total_price = ?, base_total_price = ?,
-                    girls_group_free_count = ?, boys_group_free_count = ?,
-                    girls_group_discount_amount = ?, boys_group_discount_amount = ?, group_discount_amount = ?,
-                    discount_count = ?, discount_amount = ?
-                WHERE id = ?
-                """,
+                _REMOVE_GUEST_BY_NAME_SQL,
                 (
-                    totals["quantity"],
-                    totals["boys"],
-                    totals["girls"],
-                    totals["total_price"],
-                    totals["base_total_price"],
-                    totals["girls_group_free_count"],
-                    totals["boys_group_free_count"],
-                    totals["girls_group_discount_amount"],
-                    totals["boys_group_discount_amount"],
-                    totals["group_discount_amount"],
-                    totals["discount_count"],
-                    totals["discount_amount"],
-                    row["id"],
+                    event_id,
+                    *ADMIN_MUTABLE_STATUSES,
+                    full_name,
+                    clean_name,
+                    clean_surname,
                 ),
             )
-            reservation_cols = self._table_columns("reservations")
-            self._update_legacy_reservation_fields(
-                cursor=cursor,
-                reservation_id=row["id"],
-                reservation_cols=reservation_cols,
-                quantity=totals["quantity"],
-                total_price=totals["total_price"],
-            )
-
-        self.conn.commit()
-        return True, "Guest removed successfully.", self.get_reservation(row["id"])
+            row = cursor.fetchone()
+            if not row:
+                return False, "Guest not found for selected event.", None
+            normalized_status = (row["status"] or "").strip().lower()
+
+            event = self._joined_event(row)
+            if not event:
+                return False, "Event not found for reservation.", None
+
+            new_quantity = int(row["quantity"]) - 1
+            cursor.execute("DELETE FROM attendees WHERE id = ?", (row["attendee_id"],))
+            if row["hold_applied"] == 1:
+                release_tier = row["attendee_tier"] if row["attendee_tier"] in {"early", "tier1", "tier2"} else row["ticket_type"]
+                self._release_tier_hold(cursor, row["event_id"], release_tier, 1)
+
+            if new_quantity <= 0:
+                if normalized_status == STATUS_REJECTED:
+                    cursor.execute("DELETE FROM reservations WHERE id = ?", (row["id"],))
+                    return True, "Rejected guest removed and reservation deleted.", None
+                cancelled_fields = {"status": STATUS_CANCELLED, "hold_applied": 0}
+                self._update_reservation_totals(cursor, row["id"], _EMPTY_RESERVATION_TOTALS, cancelled_fields)
+                updated = self._updated_reservation(row, {**_EMPTY_RESERVATION_TOTALS, **cancelled_fields})
+            else:
+                attendee_rows = self._reservation_attendee_rows(int(row["id"]), cursor)
+                totals = self._recalculate_reservation_totals(row, attendee_rows, event)
+                self._update_reservation_totals(cursor, row["id"], totals)
+                updated = self._updated_reservation(row, totals)
+
+            return True, "Guest removed successfully.", updated
 
     def admin_rename_guest(self, attendee_id: int, full_name: str) -> Tuple[bool, str]:
         clean = (full_name or "").strip()
@@ -1564,123 +2130,97 @@ class Database:
         surname = " ".join(parts[1:]) if len(parts) > 1 else ""
         normalized = f"{first_name} {surname}".strip()
 
-        cursor = self.conn.cursor()
-        cursor.execute(
-            """
-            UPDATE attendees
-            SET full_name = ?, name = ?, surname = ?
-            WHERE id = ?
-            """,
-            (normalized, first_name, surname, attendee_id),
-        )
-        self.conn.commit()
-        if cursor.rowcount <= 0:
-            return False, "Attendee not found."
-        return True, "Guest name updated."
+        with self._write_transaction():
+            cursor = self._cursor()
+            cursor.execute(
+                """
+                UPDATE attendees
+                SET full_name = ?, name = ?, surname = ?
+                WHERE id = ?
+                """,
+                (normalized, first_name, surname, attendee_id),
+            )
+            if cursor.rowcount <= 0:
+                return False, "Attendee not found."
+            return True, "Guest name updated."
+
+    def _guest_list_query(
+        self,
+        sort_by: str,
+        search: Optional[str],
+        limit: Optional[int],
+        after_id: Optional[int],
+    ) -> Tuple[str, Tuple[Any, ...]]:
+        if sort_by not in _GUEST_LIST_ORDER:
+            sort_by = "newest"
+        limited = limit is not None and int(limit) > 0
+        params: List[Any] = []
+        if search:
+            params.extend(repeat(self._like_pattern(search), 6))
+        if after_id is not None:
+            params.append(int(after_id))
+        if limited:
+            params.append(int(limit))
+        return _GUEST_LIST_SQL[(sort_by, bool(search), after_id is not None, limited)], tuple(params)
 
     def list_guests(
         self,
         sort_by: str = "newest",
         search: Optional[str] = None,
         limit: Optional[int] = None,
+        after_id: Optional[int] = None,
     ) -> List[sqlite3.Row]:
-        order_map = {
-            "newest": "a.id DESC",
-            "name": "a.full_name COLLATE NOCASE ASC, a.id DESC",
-            "event": "e.event_datetime DESC, a.id DESC",
-            "reservation": "r.code ASC, a.id DESC",
-            "status": "r.status ASC, a.id DESC",
-        }
-        order_clause = order_map.get(sort_by, order_map["newest"])
-        query = """
-            SELECT
-                a.id AS attendee_id,
-                a.full_name,
-                COALESCE(a.gender, 'unknown') AS gender,
-                r.id AS reservation_id,
-                r.code AS reservation_code,
-                r.status AS reservation_status,
-                e.id AS event_id,
-                e.title AS event_title,
-                e.event_datetime,
-                u.tg_id AS buyer_tg_id,
-                u.name AS buyer_name,
-                u.surname AS buyer_surname
-            FROM attendees a
-            JOIN reservations r ON r.id = a.reservation_id
-            JOIN events e ON e.id = r.event_id
-            JOIN users u ON u.id = r.user_id
-            WHERE 1 = 1
-        """
-        params: List[Any] = []
-        if search:
-            pattern = f"%{search.lower()}%"
-            query += """
-                AND (
-                    LOWER(a.full_name) LIKE ?
-                    OR LOWER(r.code) LIKE ?
-                    OR LOWER(e.title) LIKE ?
-                    OR LOWER(u.name) LIKE ?
-                    OR LOWER(u.surname) LIKE ?
-                    OR CAST(u.tg_id AS TEXT) LIKE ?
-                )
-            """
-            params.extend([pattern, pattern, pattern, pattern, pattern, pattern])
-        query += f" ORDER BY {order_clause}"
-        if limit is not None and int(limit) > 0:
-            query += " LIMIT ?"
-            params.append(int(limit))
-        cursor = self.conn.cursor()
-        cursor.execute(query, tuple(params))
+        cursor = self._read_cursor()
+        cursor.execute(*self._guest_list_query(sort_by, search, limit, after_id))
         return cursor.fetchall()
 
+    def iter_guests(
+        self,
+        sort_by: str = "newest",
+        search: Optional[str] = None,
+        limit: Optional[int] = None,
+        after_id: Optional[int] = None,
+    ) -> Iterator[sqlite3.Row]:
+        with self._stream_connection() as reader:
+            cursor = reader.cursor()
+            cursor.arraysize = 256
+            cursor.execute(*self._guest_list_query(sort_by, search, limit, after_id))
+            while True:
+                rows = cursor.fetchmany()
+                if not rows:
+                    return
+                yield from rows
+
     def get_guest(self, attendee_id: int) -> Optional[sqlite3.Row]:
-        cursor = self.conn.cursor()
-        cursor.execute(
-            """
-            SELECT
-                a.id AS attendee_id,
-                a.full_name,
-                COALESCE(a.gender, 'unknown') AS gender,
-                r.id AS reservation_id,
-                r.code AS reservation_code,
-                r.status AS reservation_status,
-                e.id AS event_id,
-                e.title AS event_title,
-                e.event_datetime,
-                u.tg_id AS buyer_tg_id,
-                u.name AS buyer_name,
-                u.surname AS buyer_surname
-            FROM attendees a
-            JOIN reservations r ON r.id = a.reservation_id
-            JOIN events e ON e.id = r.event_id
-            JOIN users u ON u.id = r.user_id
-            WHERE a.id = ?
-            """,
-            (attendee_id,),
-        )
+        cursor = self._read_cursor()
+        cursor.execute(_GET_GUEST_SQL, (attendee_id,))
         return cursor.fetchone()
 
     def list_guest_name_pairs(self) -> List[Tuple[str, str]]:
-        cursor = self.conn.cursor()
-        cursor.execute(
-            """
-            SELECT name, surname, full_name
-            FROM attendees
-            ORDER BY id
-            """
-        )
-        rows = []
-        for row in cursor.fetchall():
-            first, last = self._name_parts(
-                name=row["name"],
-                surname=row["surname"],
-                full_name=row["full_name"],
-            )
-            rows.append((first, last))
-        return rows
+        cursor = self._read_connection().cursor()
+        cursor.row_factory = None
+        cursor.execute(_GUEST_NAME_PAIRS_SQL)
+        return cursor.fetchall()
 
-    def list_active_reservations(self, search: Optional[str] = None, limit: int = 12) -> List[sqlite3.Row]:
+    def iter_guest_name_pairs(self) -> Iterator[Tuple[str, str]]:
+        with self._stream_connection() as reader:
+            cursor = reader.cursor()
+            cursor.row_factory = None
+            cursor.arraysize = 256
+            cursor.execute(_GUEST_NAME_PAIRS_SQL)
+            while True:
+                rows = cursor.fetchmany()
+                if not rows:
+                    return
+                yield from rows
+
+    def list_active_reservations(
+        self,
+        search: Optional[str] = None,
+        limit: int = 12,
+        created_before: Optional[str] = None,
+        before_id: Optional[int] = None,
+    ) -> List[sqlite3.Row]:
         query = """
             SELECT
                 r.id AS reservation_id,
@@ -1704,71 +2244,78 @@ class Database:
         """
         params: List[Any] = [STATUS_PENDING, STATUS_APPROVED]
         if search:
-            pattern = f"%{search.lower()}%"
             query += """
                 AND (
-                    LOWER(r.code) LIKE ?
-                    OR LOWER(e.title) LIKE ?
-                    OR LOWER(u.name) LIKE ?
-                    OR LOWER(u.surname) LIKE ?
-                    OR CAST(u.tg_id AS TEXT) LIKE ?
+                    r.code LIKE ? ESCAPE '\\'
+                    OR e.title LIKE ? ESCAPE '\\'
+                    OR u.name LIKE ? ESCAPE '\\'
+                    OR u.surname LIKE ? ESCAPE '\\'
+                    OR CAST(u.tg_id AS TEXT) LIKE ? ESCAPE '\\'
                 )
             """
-            params.extend([pattern, pattern, pattern, pattern, pattern])
-        query += " ORDER BY r.created_at DESC LIMIT ?"
+            params.extend(repeat(self._like_pattern(search), 5))
+        if created_before and before_id is not None:
+            query += " AND (r.created_at, r.id) < (?, ?)"
+            params.extend((created_before, int(before_id)))
+        elif created_before:
+            query += " AND r.created_at < ?"
+            params.append(created_before)
+        query += " ORDER BY r.created_at DESC, r.id DESC LIMIT ?"
         params.append(limit)
-        cursor = self.conn.cursor()
+        cursor = self._read_cursor()
         cursor.execute(query, tuple(params))
         return cursor.fetchall()
 
     def cancel_reservation_for_user(self, user_id: int, reservation_code: str) -> Tuple[bool, str, Optional[Reservation]]:
-        cursor = self.conn.cursor()
-        cursor.execute(
-            """
-            SELECT *
-            FROM reservations
-            WHERE code = ? AND user_id = ?
-            """,
-            (reservation_code, user_id),
-        )
-        row = cursor.fetchone()
-        if not row:
-            return False, "Reservation not found for your account.", None
+        with self._write_transaction():
+            cursor = self._cursor()
+            cursor.execute(
+                """
+                SELECT *
+                FROM reservations
+                WHERE code = ? AND user_id = ?
+                """,
+                (reservation_code, user_id),
+            )
+            row = cursor.fetchone()
+            if not row:
+                return False, "Reservation not found for your account.", None
 
-        if row["status"] in {STATUS_CANCELLED, STATUS_REJECTED}:
-            return False, "Reservation is already inactive.", self.get_reservation(row["id"])
+            if row["status"] in {STATUS_CANCELLED, STATUS_REJECTED}:
+                return False, "Reservation is already inactive.", self._updated_reservation(row)
 
-        self._release_hold(row, cursor)
-        cursor.execute(
-            """
-            UPDATE reservations
-            SET status = ?, hold_applied = 0
-            WHERE id = ?
-            """,
-            (STATUS_CANCELLED, row["id"]),
-        )
-        self.conn.commit()
-        return True, "Reservation cancelled. Please text admin for payment resolution.", self.get_reservation(row["id"])
+            self._release_hold(row, cursor)
+            cursor.execute(
+                """
+                UPDATE reservations
+                SET status = ?, hold_applied = 0
+                WHERE id = ?
+                """,
+                (STATUS_CANCELLED, row["id"]),
+            )
+            updated = self._updated_reservation(row, {"status": STATUS_CANCELLED, "hold_applied": 0})
+            return True, "Reservation cancelled. Please text admin for payment resolution.", updated
 
     def approve_reservation(self, reservation_id: int, admin_tg_id: int) -> Tuple[bool, str, Optional[Reservation]]:
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM reservations WHERE id = ?", (reservation_id,))
-        row = cursor.fetchone()
-        if not row:
-            return False, "Reservation not found.", None
-        if row["status"] != STATUS_PENDING:
-            return False, f"Reservation is already {row['status']}.", self.get_reservation(reservation_id)
-
-        cursor.execute(
-            """
-            UPDATE reservations
-            SET status = ?, reviewed_at = ?, reviewed_by_tg_id = ?
-            WHERE id = ?
-            """,
-            (STATUS_APPROVED, self._utc_now(), admin_tg_id, reservation_id),
-        )
-        self.conn.commit()
-        return True, "Reservation approved.", self.get_reservation(reservation_id)
+        with self._write_transaction():
+            cursor = self._cursor()
+            cursor.execute("SELECT * FROM reservations WHERE id = ?", (reservation_id,))
+            row = cursor.fetchone()
+            if not row:
+                return False, "Reservation not found.", None
+            if row["status"] != STATUS_PENDING:
+                return False, f"Reservation is already {row['status']}.", self._updated_reservation(row)
+
+            review = {"status": STATUS_APPROVED, "reviewed_at": self._utc_now(), "reviewed_by_tg_id": admin_tg_id}
+            cursor.execute(
+                """
+                UPDATE reservations
+                SET status = ?, reviewed_at = ?, reviewed_by_tg_id = ?
+                WHERE id = ?
+                """,
+                (STATUS_APPROVED, review["reviewed_at"], admin_tg_id, reservation_id),
+            )
+            return True, "Reservation approved.", self._updated_reservation(row, review)
 
     def reject_reservation(
         self,
@@ -1776,185 +2323,96 @@ class Database:
         admin_tg_id: int,
         admin_note: str,
     ) -> Tuple[bool, str, Optional[Reservation]]:
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM reservations WHERE id = ?", (reservation_id,))
-        row = cursor.fetchone()
-        if not row:
-            return False, "Reservation not found.", None
-        if row["status"] != STATUS_PENDING:
-            return False, f"Reservation is already {row['status']}.", self.get_reservation(reservation_id)
-
-        self._release_hold(row, cursor)
-        cursor.execute(
-            """
-            UPDATE reservations
-            SET status = ?, admin_note = ?, reviewed_at = ?, reviewed_by_tg_id = ?, hold_applied = 0
-            WHERE id = ?
-            """,
-            (STATUS_REJECTED, admin_note, self._utc_now(), admin_tg_id, reservation_id),
-        )
-        self.conn.commit()
-        return True, "Reservation rejected.", self.get_reservation(reservation_id)
+        with self._write_transaction():
+            cursor = self._cursor()
+            cursor.execute("SELECT * FROM reservations WHERE id = ?", (reservation_id,))
+            row = cursor.fetchone()
+            if not row:
+                return False, "Reservation not found.", None
+            if row["status"] != STATUS_PENDING:
+                return False, f"Reservation is already {row['status']}.", self._updated_reservation(row)
+
+            self._release_hold(row, cursor)
+            review = {
+                "status": STATUS_REJECTED,
+                "admin_note": admin_note,
+                "reviewed_at": self._utc_now(),
+                "reviewed_by_tg_id": admin_tg_id,
+                "hold_applied": 0,
+            }
+            cursor.execute(
+                """
+                UPDATE reservations
+                SET status = ?, admin_note = ?, reviewed_at = ?, reviewed_by_tg_id = ?, hold_applied = 0
+                WHERE id = ?
+                """,
+                (STATUS_REJECTED, admin_note, review["reviewed_at"], admin_tg_id, reservation_id),
+            )
+            return True, "Reservation rejected.", self._updated_reservation(row, review)
 
     def set_event_price(self, event_id: int, price_field: str, value: float) -> bool:
-        field_map = {
-            "early_boy": "early_bird_price",
-            "early_girl": "early_bird_price_girl",
-            "tier1_boy": "regular_tier1_price",
-            "tier1_girl": "regular_tier1_price_girl",
-            "tier2_boy": "regular_tier2_price",
-            "tier2_girl": "regular_tier2_price_girl",
-        }
-        if price_field not in field_map:
+        if price_field not in _EVENT_PRICE_UPDATE_SQL:
             return False
-        cursor = self.conn.cursor()
-        cursor.execute(
-            f"UPDATE events SET {field_map[price_field]} = ? WHERE id = ?",
-            (value, event_id),
-        )
-        self.conn.commit()
-        return cursor.rowcount > 0
+        with self._write_transaction():
+            cursor = self._cursor()
+            cursor.execute(_EVENT_PRICE_UPDATE_SQL[price_field], (value, event_id))
+            return cursor.rowcount > 0
 
     def set_event_fields(self, event_id: int, updates: Dict[str, Any]) -> Tuple[bool, str]:
-        field_map = {
-            "title": "title",
-            "location": "location",
-            "datetime": "event_datetime",
-            "caption": "caption",
-            "photo": "photo_file_id",
-            "early_boy": "early_bird_price",
-            "early_girl": "early_bird_price_girl",
-            "early_qty": "early_bird_qty",
-            "tier1_boy": "regular_tier1_price",
-            "tier1_girl": "regular_tier1_price_girl",
-            "tier1_qty": "regular_tier1_qty",
-            "tier2_boy": "regular_tier2_price",
-            "tier2_girl": "regular_tier2_price_girl",
-            "tier2_qty": "regular_tier2_qty",
-            "repost_discount_enabled": "repost_discount_enabled",
-            "repost_discount_amount": "repost_discount_amount",
-            "girls_group_offer_enabled": "girls_group_offer_enabled",
-            "boys_group_offer_enabled": "boys_group_offer_enabled",
-            "payment1_title": "payment1_title",
-            "payment1_url": "payment1_url",
-            "payment2_title": "payment2_title",
-            "payment2_url": "payment2_url",
-            "payment3_title": "payment3_title",
-            "payment3_url": "payment3_url",
-        }
         if not updates:
             return False, "No fields provided."
 
-        assignments: List[str] = []
-        params: List[Any] = []
+        values: Dict[str, Any] = {}
         for key, value in updates.items():
-            if key not in field_map:
+            if key not in _EVENT_FIELD_COLUMNS:
                 return False, f"Unsupported field: {key}"
-            column = field_map[key]
-            if key == "datetime":
-                try:
-                    self.parse_event_datetime(str(value))
-                except ValueError:
-                    return False, "Invalid datetime format. Use YYYY-MM-DD HH:MM"
-            if key.endswith("_qty"):
-                try:
-                    ivalue = int(value)
-                except (TypeError, ValueError):
-                    return False, f"{key} must be integer."
-                if ivalue < 0:
-                    return False, f"{key} must be non-negative."
-                value = ivalue
-            if key in {"early_boy", "early_girl", "tier1_boy", "tier1_girl", "tier2_boy", "tier2_girl"}:
-                try:
-                    fvalue = float(value)
-                except (TypeError, ValueError):
-                    return False, f"{key} must be number."
-                if fvalue < 0:
-                    return False, f"{key} must be non-negative."
-                value = fvalue
-            if key == "repost_discount_amount":
-                try:
-                    fvalue = float(value)
-                except (TypeError, ValueError):
-                    return False, "repost_discount_amount must be number."
-                if fvalue < 0:
-                    return False, "repost_discount_amount must be non-negative."
-                value = fvalue
-            if key == "repost_discount_enabled":
-                if isinstance(value, str):
-                    normalized = value.strip().lower()
-                    if normalized in {"1", "true", "yes", "on"}:
-                        value = 1
-                    elif normalized in {"0", "false", "no", "off", ""}:
-                        value = 0
-                    else:
-                        return False, "repost_discount_enabled must be boolean."
-                else:
-                    value = 1 if bool(value) else 0
-            if key in {"girls_group_offer_enabled", "boys_group_offer_enabled"}:
-                if isinstance(value, str):
-                    normalized = value.strip().lower()
-                    if normalized in {"1", "true", "yes", "on"}:
-                        value = 1
-                    elif normalized in {"0", "false", "no", "off", ""}:
-                        value = 0
-                    else:
-                        return False, f"{key} must be boolean."
-                else:
-                    value = 1 if bool(value) else 0
-            if key in {"payment1_title", "payment2_title", "payment3_title"}:
-                value = str(value or "").strip()
-            if key in {"payment1_url", "payment2_url", "payment3_url"}:
-                value = str(value or "").strip()
-                if value and not value.lower().startswith("https://"):
-                    return False, f"{key} must start with https://"
-
-            assignments.append(f"{column} = ?")
-            params.append(value)
-
-        params.append(event_id)
-        cursor = self.conn.cursor()
-        cursor.execute(f"UPDATE events SET {', '.join(assignments)} WHERE id = ?", tuple(params))
-        self.conn.commit()
-        if cursor.rowcount <= 0:
-            return False, "Event not found."
-        return True, "Event updated."
+            value, error = _EVENT_FIELD_VALIDATORS.get(key, _keep_value)(key, value)
+            if error:
+                return False, error
+            values[_EVENT_FIELD_COLUMNS[key]] = value
+
+        columns = tuple(sorted(values))
+        with self._write_transaction():
+            cursor = self._cursor()
+            cursor.execute(self._event_update_statement(columns), (*(values[column] for column in columns), event_id))
+            if cursor.rowcount <= 0:
+                return False, "Event not found."
+            return True, "Event updated."
 
     def delete_event(self, event_id: int) -> Tuple[bool, str, Dict[str, int]]:
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT id, title FROM events WHERE id = ?", (event_id,))
-        event_row = cursor.fetchone()
-        if not event_row:
-            return False, "Event not found.", {"events": 0, "reservations": 0, "attendees": 0}
+        try:
+            with self._write_transaction():
+                cursor = self._cursor()
+                cursor.execute(
+                    """
+                    SELECT COUNT(DISTINCT r.id) AS reservation_count, COUNT(a.id) AS attendee_count
+                    FROM events e
+                    LEFT JOIN reservations r ON r.event_id = e.id
+                    LEFT JOIN attendees a ON a.reservation_id = r.id
+                    WHERE e.id = ?
+                    GROUP BY e.id
+                    """,
+                    (event_id,),
+                )
+                event_row = cursor.fetchone()
+                if not event_row:
+                    return False, "Event not found.", {"events": 0, "reservations": 0, "attendees": 0}
 
-        cursor.execute(
-            "SELECT COUNT(*) AS cnt FROM reservations WHERE event_id = ?",
-            (event_id,),
-        )
-        reservation_count = int(cursor.fetchone()["cnt"])
-        cursor.execute(
-            """
-            SELECT COUNT(*) AS cnt
-            FROM attendees
-            WHERE reservation_id IN (SELECT id FROM reservations WHERE event_id = ?)
-            """,
-            (event_id,),
-        )
-        attendee_count = int(cursor.fetchone()["cnt"])
+                reservation_count = int(event_row["reservation_count"])
+                attendee_count = int(event_row["attendee_count"])
 
-        try:
-            cursor.execute(
-                """
-                DELETE FROM attendees
-                WHERE reservation_id IN (SELECT id FROM reservations WHERE event_id = ?)
-                """,
-                (event_id,),
-            )
-            cursor.execute("DELETE FROM reservations WHERE event_id = ?", (event_id,))
-            cursor.execute("DELETE FROM events WHERE id = ?", (event_id,))
-            self.conn.commit()
+                # Uncorrelated list subquery: one idx_reservations_event_status_cover seek, then
+                # idx_attendees_reservation lookups per reservation id.
+                cursor.execute(
+                    """
+                    DELETE FROM attendees
+                    WHERE reservation_id IN (SELECT id FROM reservations WHERE event_id = ?)
+                    """,
+                    (event_id,),
+                )
+                cursor.execute("DELETE FROM reservations WHERE event_id = ?", (event_id,))
+                cursor.execute("DELETE FROM events WHERE id = ?", (event_id,))
         except sqlite3.Error as exc:
-            self.conn.rollback()
             return False, f"Failed to delete event: {exc}", {"events": 0, "reservations": 0, "attendees": 0}
 
         return (
@@ -1964,8 +2422,8 @@ class Database:
         )
 
     def list_blocked_users(self) -> List[sqlite3.Row]:
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM users WHERE blocked = 1")
+        cursor = self._read_cursor()
+        cursor.execute(_LIST_BLOCKED_USERS_SQL)
         return cursor.fetchall()
 
     def list_event_stats(
@@ -1974,58 +2432,29 @@ class Database:
         search: Optional[str] = None,
         limit: int = 30,
     ) -> List[sqlite3.Row]:
-        order_map = {
-            "date": "e.event_datetime DESC",
-            "title": "e.title COLLATE NOCASE ASC",
-            "approved": "approved_tickets DESC, e.event_datetime DESC",
-            "pending": "pending_tickets DESC, e.event_datetime DESC",
-            "sold": "held_tickets DESC, e.event_datetime DESC",
-            "revenue": "approved_revenue DESC, e.event_datetime DESC",
-        }
-        order_clause = order_map.get(sort_by, order_map["date"])
-
-        query = """
-            SELECT
-                e.id,
-                e.title,
-                e.event_datetime,
-                e.location,
-                COALESCE(SUM(CASE WHEN r.status = ? THEN r.quantity ELSE 0 END), 0) AS approved_tickets,
-                COALESCE(SUM(CASE WHEN r.status = ? THEN r.quantity ELSE 0 END), 0) AS pending_tickets,
-                COALESCE(SUM(CASE WHEN r.status = ? THEN r.quantity ELSE 0 END), 0) AS rejected_tickets,
-                COALESCE(SUM(CASE WHEN r.status = ? THEN r.quantity ELSE 0 END), 0) AS cancelled_tickets,
-                COALESCE(
-                    SUM(CASE WHEN r.status IN (?, ?) THEN r.quantity ELSE 0 END),
-                    0
-                ) AS held_tickets,
-                COALESCE(SUM(CASE WHEN r.status = ? THEN r.total_price ELSE 0 END), 0) AS approved_revenue,
-                COALESCE(SUM(CASE WHEN r.status = ? THEN r.total_price ELSE 0 END), 0) AS pending_revenue
-            FROM events e
-            LEFT JOIN reservations r ON r.event_id = e.id
-            WHERE e.status = 'open'
-        """
-        params: List[object] = [
-            STATUS_APPROVED,
-            STATUS_PENDING,
-            STATUS_REJECTED,
-            STATUS_CANCELLED,
-            STATUS_APPROVED,
-            STATUS_PENDING,
-            STATUS_APPROVED,
-            STATUS_PENDING,
-        ]
+        if sort_by not in _EVENT_STATS_ORDER:
+            sort_by = "date"
+
+        stamp = self.change_stamp(_EVENT_STATS_TTL_SECONDS)
+        if stamp != self._event_stats_stamp:
+            self._event_stats_cache = {}
+            self._event_stats_stamp = stamp
+        key = (sort_by, search or None, limit)
+        cached = self._event_stats_cache.get(key)
+        if cached is not None:
+            return list(cached)
+
+        params: List[object] = []
         if search:
-            query += " AND (LOWER(e.title) LIKE ? OR LOWER(e.location) LIKE ?)"
-            pattern = f"%{search.lower()}%"
+            pattern = self._like_pattern(search)
             params.extend([pattern, pattern])
-
-        query += " GROUP BY e.id"
-        query += f" ORDER BY {order_clause} LIMIT ?"
         params.append(limit)
 
-        cursor = self.conn.cursor()
-        cursor.execute(query, tuple(params))
-        return cursor.fetchall()
+        cursor = self._read_cursor()
+        cursor.execute(_EVENT_STATS_SQL[(sort_by, bool(search))], tuple(params))
+        rows = cursor.fetchall()
+        self._event_stats_cache[key] = rows
+        return list(rows)
 
     def search_reservations(
         self,
@@ -2033,88 +2462,48 @@ class Database:
         sort_by: str = "newest",
         limit: int = 20,
     ) -> List[sqlite3.Row]:
-        order_map = {
-            "newest": "r.created_at DESC",
-            "amount": "r.total_price DESC, r.created_at DESC",
-            "status": "r.status ASC, r.created_at DESC",
-            "event_date": "e.event_datetime DESC, r.created_at DESC",
-        }
-        order_clause = order_map.get(sort_by, order_map["newest"])
-
-        pattern = f"%{query_text.lower()}%"
-        cursor = self.conn.cursor()
-        cursor.execute(
-            f"""
-            SELECT
-                r.id,
-                r.code,
-                r.status,
-                r.quantity,
-                r.boys,
-                r.girls,
-                r.total_price,
-                r.created_at,
-                e.id AS event_id,
-                e.title AS event_title,
-                e.event_datetime,
-                u.tg_id,
-                u.name AS buyer_name,
-                u.surname AS buyer_surname,
-                u.phone
-            FROM reservations r
-            JOIN events e ON e.id = r.event_id
-            JOIN users u ON u.id = r.user_id
-            WHERE
-                LOWER(r.code) LIKE ?
-                OR LOWER(e.title) LIKE ?
-                OR LOWER(u.name) LIKE ?
-                OR LOWER(u.surname) LIKE ?
-                OR LOWER(COALESCE(u.phone, '')) LIKE ?
-                OR CAST(u.tg_id AS TEXT) LIKE ?
-            ORDER BY {order_clause}
-            LIMIT ?
-            """,
-            (pattern, pattern, pattern, pattern, pattern, pattern, limit),
-        )
+        if sort_by not in _RESERVATION_SEARCH_ORDER:
+            sort_by = "newest"
+
+        cursor = self._read_cursor()
+        query_text = unicodedata.normalize("NFC", query_text or "")
+        code = query_text.strip().upper()
+        if not code:
+            cursor.execute(_RESERVATION_SEARCH_SQL[(sort_by, "all")], (limit,))
+            return cursor.fetchall()
+        if RESERVATION_CODE_PATTERN.fullmatch(code):
+            cursor.execute(_RESERVATION_SEARCH_SQL[(sort_by, "code")], (code, limit))
+            rows = cursor.fetchall()
+            if rows:
+                return rows
+
+        text = query_text.strip()
+        if len(text) >= _RESERVATION_SEARCH_MIN_MATCH:
+            phrase = '"' + text.replace('"', '""') + '"'
+            cursor.execute(_RESERVATION_SEARCH_SQL[(sort_by, "match")], (phrase, limit))
+            return cursor.fetchall()
+
+        pattern = self._like_pattern(query_text)
+        if code.isdigit():
+            cursor.execute(_RESERVATION_SEARCH_SQL[(sort_by, "digits")], (*repeat(pattern, 6), limit))
+        else:
+            cursor.execute(_RESERVATION_SEARCH_SQL[(sort_by, "text")], (*repeat(pattern, 5), limit))
         return cursor.fetchall()
 
-    def export_event_csv(self, event_id: int) -> List[List[str]]:
-        cursor = self.conn.cursor()
-        cursor.execute(
-            """
-            SELECT r.code, r.ticket_type, r.boys, r.girls, r.quantity, r.total_price,
-                   r.status, r.payment_file_type, r.payment_file_id, r.admin_note,
-                   u.name, u.surname, u.phone
-            FROM reservations r
-            JOIN users u ON r.user_id = u.id
-            WHERE r.event_id = ?
-            ORDER BY r.created_at
-            """,
-            (event_id,),
-        )
-        rows = []
-        for row in cursor.fetchall():
-            rows.append(
-                [
-                    row["code"],
-                    row["ticket_type"],
-                    str(row["boys"]),
-                    str(row["girls"]),
-                    str(row["quantity"]),
-                    str(row["total_price"]),
-                    row["status"],
-                    row["payment_file_type"],
-                    row["payment_file_id"],
-                    row["admin_note"],
-                    row["name"],
-                    row["surname"],
-                    row["phone"],
-                ]
-            )
-        return rows
+    def export_event_csv(self, event_id: int) -> Iterator[Tuple]:
+        with self._stream_connection() as reader:
+            cursor = reader.cursor()
+            cursor.row_factory = None
+            cursor.arraysize = 256
+            cursor.execute(_EXPORT_EVENT_CSV_SQL, (event_id,))
+            while True:
+                rows = cursor.fetchmany()
+                if not rows:
+                    return
+                yield from rows
 
     def list_external_payment_files(self) -> List[sqlite3.Row]:
-        cursor = self.conn.cursor()
+        cursor = self._read_cursor()
         cursor.execute(
             """
             SELECT payment_file_id, status
@@ -2126,7 +2515,7 @@ class Database:
         return cursor.fetchall()
 
     def list_external_repost_files(self) -> List[sqlite3.Row]:
-        cursor = self.conn.cursor()
+        cursor = self._read_cursor()
         cursor.execute(
             """
             SELECT a.repost_proof_file_id AS payment_file_id, r.status
@@ -1,36 +1,55 @@
+import asyncio
+import csv
+import hashlib
 import os
+import re
+import secrets
+import tempfile
 import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import fields
 from datetime import datetime, timedelta
-from io import BytesIO
+from operator import attrgetter
+from io import StringIO
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Annotated, Any, AsyncIterator, BinaryIO, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
 import json
-import uuid
-import urllib.request
-import urllib.error
-from urllib.parse import unquote, urlparse
-from zoneinfo import ZoneInfo
+from urllib.parse import parse_qs, quote as url_quote, unquote, urlparse
 
+import httpx
 from dotenv import load_dotenv
-from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi import BackgroundTasks, FastAPI, File, Form, HTTPException, Request, UploadFile
+from fastapi.responses import JSONResponse, ORJSONResponse, Response, StreamingResponse
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from openpyxl import Workbook, load_workbook
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints
+from starlette.concurrency import run_in_threadpool
 from starlette.datastructures import UploadFile as StarletteUploadFile
 
-from ticketbot.database import Database, STATUS_PENDING
+from ticketbot.database import BUDAPEST_TZ, EVENT_DT_FORMAT, EVENT_EXPORT_CSV_HEADERS, Database, STATUS_PENDING
+from ticketbot.models import Event, Reservation
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 BASE_DIR = Path(__file__).resolve().parent
 WEB_DIR = BASE_DIR / "miniapp"
+INDEX_HTML = (WEB_DIR / "index.html").read_bytes()
+ADMIN_HTML = (WEB_DIR / "admin.html").read_bytes()
 
 load_dotenv()
 DATABASE_PATH = os.getenv("DATABASE_PATH", "data/bot.db")
-ADMIN_IDS = {int(x) for x in os.getenv("ADMIN_IDS", "").split(",") if x.strip().isdigit()}
+ADMIN_IDS = frozenset(int(x) for x in os.getenv("ADMIN_IDS", "").split(",") if x.strip().isdigit())
 BOT_TOKEN = os.getenv("BOT_TOKEN", "")
 WEB_APP_URL = os.getenv("WEB_APP_URL", "").rstrip("/")
 DEFAULT_UPLOAD_DIR = str(Path(DATABASE_PATH).resolve().parent / "uploads")
 UPLOAD_DIR = os.getenv("UPLOAD_DIR", DEFAULT_UPLOAD_DIR)
+UPLOAD_ACCEL_REDIRECT_PREFIX = os.getenv("UPLOAD_ACCEL_REDIRECT_PREFIX", "").strip().rstrip("/")
 
 
 def _env_positive_float(name: str, default: float) -> float:
@@ -57,16 +76,76 @@ def _env_positive_int(name: str, default: int) -> int:
 
 UPLOAD_MAX_MB = _env_positive_float("UPLOAD_MAX_MB", 5.0)
 MAX_UPLOAD_BYTES = int(UPLOAD_MAX_MB * 1024 * 1024)
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+_UPLOAD_MAGIC = (
+    (b"%PDF", ".pdf"),
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+)
+XLSX_IMPORT_MAX_MB = _env_positive_float("XLSX_IMPORT_MAX_MB", 50.0)
+MAX_XLSX_IMPORT_BYTES = int(XLSX_IMPORT_MAX_MB * 1024 * 1024)
 UPLOAD_RETENTION_DAYS = _env_positive_int("UPLOAD_RETENTION_DAYS", 7)
 UPLOAD_CLEANUP_INTERVAL_SECONDS = _env_positive_int("UPLOAD_CLEANUP_INTERVAL_SECONDS", 3600)
 _LAST_UPLOAD_CLEANUP_TS = 0.0
+BOT_API_TIMEOUT_SECONDS = 12
+BOOKING_RATE_LIMIT_PER_MINUTE = _env_positive_int("BOOKING_RATE_LIMIT_PER_MINUTE", 5)
+IMPORT_RATE_LIMIT_PER_MINUTE = _env_positive_int("IMPORT_RATE_LIMIT_PER_MINUTE", 2)
+RATE_LIMIT_SWEEP_SIZE = 1024
+_RATE_LIMIT_HITS: Dict[Tuple[str, int], Deque[float]] = defaultdict(deque)
+_HTTP_CLIENT: Optional[httpx.AsyncClient] = None
+EVENTS_CACHE_TTL_SECONDS = _env_positive_int("EVENTS_CACHE_TTL_SECONDS", 5)
+_EVENTS_RESPONSE_CACHE: Dict[str, Tuple[bytes, str]] = {}
+_EVENTS_RESPONSE_STAMP: Tuple[int, int] = (-1, -1)
+_WHITESPACE_RE = re.compile(r"\s")
+_TIER_LABELS = {
+    "early": "Early Bird",
+    "tier1": "Regular Tier-1",
+    "tier2": "Regular Tier-2",
+}
+XLSX_SPOOL_MAX_BYTES = 16 * 1024 * 1024
+XLSX_STREAM_CHUNK_BYTES = 64 * 1024
+CSV_STREAM_ROWS_PER_CHUNK = 256
+ADMIN_BOOTSTRAP_MAX_AGE_SECONDS = 300
+GZIP_MINIMUM_SIZE = 1024
+GZIP_COMPRESS_LEVEL = 5
+STATIC_VERSIONED_CACHE_CONTROL = "public, max-age=31536000, immutable"
+JSON_STREAM_ROWS_PER_CHUNK = 256
+ADMIN_GUESTS_STREAM_THRESHOLD = 200
+XLSX_WORKERS = _env_positive_int("XLSX_WORKERS", 2)
+_XLSX_EXECUTOR = ThreadPoolExecutor(max_workers=XLSX_WORKERS, thread_name_prefix="xlsx")
 
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 db = Database(DATABASE_PATH)
 
-app = FastAPI(title="TicketBot Mini App Server")
-app.mount("/static", StaticFiles(directory=str(WEB_DIR)), name="static")
-app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
+
+class _VersionedStaticFiles(StaticFiles):
+    async def get_response(self, path: str, scope) -> Response:
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            versioned = "v" in parse_qs(scope.get("query_string", b"").decode("latin-1"))
+            response.headers["Cache-Control"] = STATIC_VERSIONED_CACHE_CONTROL if versioned else "no-cache"
+        return response
+
+
+@asynccontextmanager
+async def _lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    _maybe_run_upload_cleanup(force=True)
+    await _open_http_client()
+    try:
+        yield
+    finally:
+        await _close_http_client()
+
+
+app = FastAPI(
+    title="TicketBot Mini App Server",
+    lifespan=_lifespan,
+    default_response_class=ORJSONResponse if orjson is not None else JSONResponse,
+)
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE, compresslevel=GZIP_COMPRESS_LEVEL)
+app.mount("/static", _VersionedStaticFiles(directory=str(WEB_DIR)), name="static")
+if not UPLOAD_ACCEL_REDIRECT_PREFIX:
+    app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
 
 
 def _extract_upload_filename(payment_file_id: str) -> Optional[str]:
@@ -102,33 +181,83 @@ async def _store_upload_file(file: StarletteUploadFile, *, label: str, allow_pdf
     elif not mime.startswith("image/"):
         raise HTTPException(status_code=400, detail=f"Only image is accepted for {label}.")
 
-    if mime == "application/pdf":
-        suffix = ".pdf"
-    elif mime == "image/png":
-        suffix = ".png"
-    else:
-        suffix = ".jpg"
+    suffix = _sniff_upload_suffix(file.file)
+    if suffix == ".pdf" and not allow_pdf:
+        raise HTTPException(status_code=400, detail=f"Only image is accepted for {label}.")
+    if suffix is None:
+        if mime == "application/pdf":
+            suffix = ".pdf"
+        elif mime == "image/png":
+            suffix = ".png"
+        else:
+            suffix = ".jpg"
 
-    stored_name = f"{uuid.uuid4().hex}{suffix}"
-    stored_path = Path(UPLOAD_DIR) / stored_name
+    stored_name = secrets.token_hex(16) + suffix
+    stored_path = os.path.join(UPLOAD_DIR, stored_name)
     try:
-        content = await file.read()
-        if not content:
-            raise HTTPException(status_code=400, detail=f"Uploaded {label} is empty.")
-        if len(content) > MAX_UPLOAD_BYTES:
-            raise HTTPException(
-                status_code=413,
-                detail=f"File is too large. Max allowed size is {UPLOAD_MAX_MB:.1f} MB.",
-            )
+        if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+            raise _upload_too_large()
+        try:
+            await run_in_threadpool(_copy_upload, file.file, stored_path, label)
+        except OSError as exc:
+            raise HTTPException(status_code=507, detail=f"Upload storage error: {exc}") from exc
     finally:
         await file.close()
-    try:
-        stored_path.write_bytes(content)
-    except OSError as exc:
-        raise HTTPException(status_code=507, detail=f"Upload storage error: {exc}") from exc
     return _build_upload_url(stored_name), "external"
 
 
+def _sniff_upload_suffix(source: BinaryIO) -> Optional[str]:
+    source.seek(0)
+    head = source.read(16)
+    source.seek(0)
+    for magic, suffix in _UPLOAD_MAGIC:
+        if head.startswith(magic):
+            return suffix
+    return None
+
+
+def _upload_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"File is too large. Max allowed size is {UPLOAD_MAX_MB:.1f} MB.",
+    )
+
+
+def _copy_upload(source: BinaryIO, stored_path: str, label: str) -> int:
+    total = 0
+    source.seek(0)
+    try:
+        with open(stored_path, "wb") as output:
+            while chunk := source.read(UPLOAD_CHUNK_BYTES):
+                total += len(chunk)
+                if total > MAX_UPLOAD_BYTES:
+                    raise _upload_too_large()
+                output.write(chunk)
+        if not total:
+            raise HTTPException(status_code=400, detail=f"Uploaded {label} is empty.")
+    except BaseException:
+        try:
+            os.unlink(stored_path)
+        except FileNotFoundError:
+            pass
+        raise
+    return total
+
+
+def _rate_limit(bucket: str, tg_id: int, limit: int, per_seconds: float = 60.0) -> None:
+    now = time.monotonic()
+    cutoff = now - per_seconds
+    if len(_RATE_LIMIT_HITS) >= RATE_LIMIT_SWEEP_SIZE:
+        for key in [key for key, hits in _RATE_LIMIT_HITS.items() if not hits or hits[-1] <= cutoff]:
+            del _RATE_LIMIT_HITS[key]
+    hits = _RATE_LIMIT_HITS[(bucket, tg_id)]
+    while hits and hits[0] <= cutoff:
+        hits.popleft()
+    if len(hits) >= limit:
+        raise HTTPException(status_code=429, detail="Too many requests. Please try again in a minute.")
+    hits.append(now)
+
+
 def _pending_status(status: str) -> bool:
     normalized = (status or "").strip().lower()
     return normalized in {
@@ -207,13 +336,47 @@ def _maybe_run_upload_cleanup(force: bool = False) -> None:
         return
 
 
-@app.on_event("startup")
-def startup_cleanup() -> None:
-    _maybe_run_upload_cleanup(force=True)
+def _encode_json(payload: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _json_response(payload: Dict[str, Any]) -> Response:
+    return Response(content=_encode_json(payload), media_type="application/json")
+
+
+def _iter_json_items(rows: Iterable[Any]) -> Iterator[bytes]:
+    yield b'{"items":['
+    separator = b""
+    batch: List[bytes] = []
+    for row in rows:
+        batch.append(_encode_json(_row_dict(row)))
+        if len(batch) >= JSON_STREAM_ROWS_PER_CHUNK:
+            yield separator + b",".join(batch)
+            separator = b","
+            batch.clear()
+    if batch:
+        yield separator + b",".join(batch)
+    yield b"]}"
+
 
+def _cached_events_response(key: str, build: Callable[[], Dict[str, Any]]) -> Tuple[bytes, str]:
+    global _EVENTS_RESPONSE_STAMP
+    stamp = db.change_stamp(EVENTS_CACHE_TTL_SECONDS)
+    if stamp != _EVENTS_RESPONSE_STAMP:
+        _EVENTS_RESPONSE_CACHE.clear()
+        _EVENTS_RESPONSE_STAMP = stamp
+    cached = _EVENTS_RESPONSE_CACHE.get(key)
+    if cached is None:
+        body = _encode_json(build())
+        cached = _EVENTS_RESPONSE_CACHE[key] = (body, f'W/"{hashlib.blake2b(body, digest_size=8).hexdigest()}"')
+    return cached
 
-def _event_payload(event) -> Dict[str, Any]:
-    tier = db.active_tier(event)
+
+def _event_payload(event, tier: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    if tier is None:
+        tier = db.active_tier(event)
     payment_options = []
     for idx in (1, 2, 3):
         title = (getattr(event, f"payment{idx}_title", "") or "").strip()
@@ -252,36 +415,47 @@ def _event_payload(event) -> Dict[str, Any]:
 
 
 def _tier_label(tier_key: str) -> str:
-    labels = {
-        "early": "Early Bird",
-        "tier1": "Regular Tier-1",
-        "tier2": "Regular Tier-2",
-    }
-    return labels.get(tier_key, tier_key)
+    return _TIER_LABELS.get(tier_key, tier_key)
+
+
+async def _open_http_client() -> None:
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None:
+        _HTTP_CLIENT = httpx.AsyncClient(
+            timeout=BOT_API_TIMEOUT_SECONDS,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+        )
+
 
+async def _close_http_client() -> None:
+    global _HTTP_CLIENT
+    client, _HTTP_CLIENT = _HTTP_CLIENT, None
+    if client is not None:
+        await client.aclose()
 
-def _bot_api(method: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+
+async def _bot_api(method: str, payload: Dict[str, Any]) -> Dict[str, Any]:
     if not BOT_TOKEN:
         return {"ok": False, "description": "BOT_TOKEN is missing"}
-    url = f"https://api.telegram.org/bot{BOT_TOKEN}/{method}"
-    req = urllib.request.Request(
-        url,
-        data=json.dumps(payload).encode("utf-8"),
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
+    if _HTTP_CLIENT is None:
+        await _open_http_client()
     try:
-        with urllib.request.urlopen(req, timeout=12) as resp:
-            body = resp.read().decode("utf-8")
-            return json.loads(body)
-    except (urllib.error.URLError, urllib.error.HTTPError, TimeoutError):
+        resp = await _HTTP_CLIENT.post(f"https://api.telegram.org/bot{BOT_TOKEN}/{method}", json=payload)
+        return resp.json()
+    except (httpx.HTTPError, ValueError):
         return {"ok": False}
 
 
-def _notify_admins_pending_from_miniapp(reservation) -> None:
-    event = db.get_event(reservation.event_id)
-    user = db.get_user_by_id(reservation.user_id)
-    attendees = db.list_attendees(reservation.id)
+def _pending_review_context(reservation) -> Tuple[Any, Any, List[Any]]:
+    return (
+        db.get_event(reservation.event_id),
+        db.get_user_by_id(reservation.user_id),
+        db.list_attendees(reservation.id),
+    )
+
+
+async def _notify_admins_pending_from_miniapp(reservation) -> None:
+    event, user, attendees = await run_in_threadpool(_pending_review_context, reservation)
     attendee_lines = "\n".join([f"- {row['full_name']}" for row in attendees]) if attendees else "-"
     repost_lines = "\n".join(
         [
@@ -327,20 +501,25 @@ def _notify_admins_pending_from_miniapp(reservation) -> None:
             ],
         ]
     }
-    for admin_id in ADMIN_IDS:
-        _bot_api(
-            "sendMessage",
-            {
-                "chat_id": admin_id,
-                "text": caption,
-                "reply_markup": buttons,
-                "disable_web_page_preview": False,
-            },
-        )
+    await asyncio.gather(
+        *(
+            _bot_api(
+                "sendMessage",
+                {
+                    "chat_id": admin_id,
+                    "text": caption,
+                    "reply_markup": buttons,
+                    "disable_web_page_preview": False,
+                },
+            )
+            for admin_id in ADMIN_IDS
+        ),
+        return_exceptions=True,
+    )
 
 
-def _notify_user_pending_from_miniapp(reservation, tg_id: int) -> None:
-    _bot_api(
+async def _notify_user_pending_from_miniapp(reservation, tg_id: int) -> None:
+    await _bot_api(
         "sendMessage",
         {
             "chat_id": tg_id,
@@ -355,42 +534,50 @@ def _notify_user_pending_from_miniapp(reservation, tg_id: int) -> None:
     )
 
 
-class QuoteRequest(BaseModel):
+StrippedStr = Annotated[str, StringConstraints(strip_whitespace=True)]
+LoweredStr = Annotated[str, StringConstraints(strip_whitespace=True, to_lower=True)]
+
+
+class _RequestModel(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
+
+class QuoteRequest(_RequestModel):
     event_id: int
     boys: int = Field(ge=0)
     girls: int = Field(ge=0)
 
 
-class AdminGuestAddRequest(BaseModel):
+class AdminGuestAddRequest(_RequestModel):
     tg_id: int
-    reservation_code: str
-    gender: str
-    full_name: str
+    reservation_code: StrippedStr
+    gender: LoweredStr
+    full_name: StrippedStr
 
 
-class AdminGuestRemoveRequest(BaseModel):
+class AdminGuestRemoveRequest(_RequestModel):
     tg_id: int
     attendee_id: int
 
 
-class AdminGuestRenameRequest(BaseModel):
+class AdminGuestRenameRequest(_RequestModel):
     tg_id: int
     attendee_id: int
-    full_name: str
+    full_name: StrippedStr
 
 
-class AdminEventUpdateRequest(BaseModel):
+class AdminEventUpdateRequest(_RequestModel):
     tg_id: int
     event_id: int
     updates: Dict[str, Any]
 
 
-class AdminEventDeleteRequest(BaseModel):
+class AdminEventDeleteRequest(_RequestModel):
     tg_id: int
     event_id: int
 
 
-class AdminEventCreateSimpleRequest(BaseModel):
+class AdminEventCreateSimpleRequest(_RequestModel):
     tg_id: int
     title: str
     caption: str = ""
@@ -417,25 +604,25 @@ class AdminEventCreateSimpleRequest(BaseModel):
     event_datetime: Optional[str] = None
 
 
-class AdminGuestAddByEventRequest(BaseModel):
+class AdminGuestAddByEventRequest(_RequestModel):
     tg_id: int
     event_id: int
-    name: str
-    surname: str
-    gender: str
+    name: StrippedStr
+    surname: StrippedStr
+    gender: LoweredStr
 
 
-class AdminGuestRemoveByNameRequest(BaseModel):
+class AdminGuestRemoveByNameRequest(_RequestModel):
     tg_id: int
     event_id: int
-    name: str
-    surname: str
+    name: StrippedStr
+    surname: StrippedStr
 
 
 def _require_admin(tg_id: Optional[int]) -> int:
-    if tg_id is None:
-        raise HTTPException(status_code=401, detail="Missing tg_id.")
     if tg_id not in ADMIN_IDS:
+        if tg_id is None:
+            raise HTTPException(status_code=401, detail="Missing tg_id.")
         raise HTTPException(status_code=403, detail="Admin access denied.")
     return tg_id
 
@@ -444,6 +631,20 @@ def _row_dict(row) -> Dict[str, Any]:
     return dict(row) if row is not None else {}
 
 
+def _dataclass_serializer(cls) -> Callable[[Any], Optional[Dict[str, Any]]]:
+    names = tuple(field.name for field in fields(cls))
+    values = attrgetter(*names)
+    return lambda obj: dict(zip(names, values(obj))) if obj is not None else None
+
+
+_event_dict = _dataclass_serializer(Event)
+_reservation_dict = _dataclass_serializer(Reservation)
+
+
+_NAME_HEADERS = frozenset({"name", "first_name", "firstname", "first name", "isim", "имя"})
+_SURNAME_HEADERS = frozenset({"surname", "last_name", "lastname", "last name", "soyad", "фамилия"})
+
+
 def _normalize_header_cell(value: Any) -> str:
     if value is None:
         return ""
@@ -457,21 +658,15 @@ def _parse_guest_row(row: tuple, row_index: int) -> Dict[str, Any]:
     if not value_name and not value_surname:
         return {"skip": True, "reason": "empty"}
 
-    if row_index == 1:
-        h1 = _normalize_header_cell(value_name)
-        h2 = _normalize_header_cell(value_surname)
-        if h1 in {"name", "first_name", "firstname", "first name", "isim", "имя"} and h2 in {
-            "surname",
-            "last_name",
-            "lastname",
-            "last name",
-            "soyad",
-            "фамилия",
-        }:
-            return {"skip": True, "reason": "header"}
+    if (
+        row_index == 1
+        and _normalize_header_cell(value_name) in _NAME_HEADERS
+        and _normalize_header_cell(value_surname) in _SURNAME_HEADERS
+    ):
+        return {"skip": True, "reason": "header"}
 
     if value_name and not value_surname and " " in value_name:
-        parts = [p for p in value_name.split() if p]
+        parts = value_name.split()
         if len(parts) >= 2:
             value_name = parts[0]
             value_surname = " ".join(parts[1:])
@@ -491,13 +686,23 @@ def _parse_guest_row(row: tuple, row_index: int) -> Dict[str, Any]:
 
 
 @app.get("/")
-def root() -> FileResponse:
-    return FileResponse(WEB_DIR / "index.html")
+def root() -> Response:
+    return Response(content=INDEX_HTML, media_type="text/html")
 
 
 @app.get("/admin")
-def admin_page() -> FileResponse:
-    return FileResponse(WEB_DIR / "admin.html")
+def admin_page() -> Response:
+    return Response(content=ADMIN_HTML, media_type="text/html")
+
+
+def upload_accel_redirect(name: str) -> Response:
+    if not name or name in {".", ".."} or Path(name).name != name:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return Response(headers={"X-Accel-Redirect": f"{UPLOAD_ACCEL_REDIRECT_PREFIX}/{url_quote(name)}"})
+
+
+if UPLOAD_ACCEL_REDIRECT_PREFIX:
+    app.add_api_route("/uploads/{name}", upload_accel_redirect, methods=["GET"])
 
 
 @app.get("/health")
@@ -506,12 +711,20 @@ def health() -> Dict[str, str]:
 
 
 @app.get("/api/events")
-def list_events() -> Dict[str, Any]:
+def list_events(request: Request) -> Response:
+    body, etag = _cached_events_response("public", _build_public_events)
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={EVENTS_CACHE_TTL_SECONDS}"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _build_public_events() -> Dict[str, Any]:
     items = []
     for event in db.list_events():
-        payload = _event_payload(event)
-        if payload["tier"]:
-            items.append(payload)
+        tier = db.active_tier(event)
+        if tier:
+            items.append(_event_payload(event, tier))
     return {"items": items}
 
 
@@ -535,29 +748,26 @@ def my_tickets(tg_id: int, limit: int = 20) -> Dict[str, Any]:
     user = db.get_user(tg_id)
     if not user:
         raise HTTPException(status_code=404, detail="User profile not found. Run /start in bot.")
-    rows = db.list_reservations_for_user(user.id)[: max(1, min(limit, 100))]
     items = []
-    for reservation in rows:
-        event = db.get_event(reservation.event_id)
-        attendees = db.list_attendees(reservation.id)
+    for reservation, event_title, attendee_names in db.list_user_tickets(user.id, max(1, min(limit, 100))):
         items.append(
             {
                 "code": reservation.code,
                 "event_id": reservation.event_id,
-                "event_title": event.title if event else f"Event #{reservation.event_id}",
+                "event_title": event_title if event_title is not None else f"Event #{reservation.event_id}",
                 "status": reservation.status,
                 "tier_label": _tier_label(reservation.ticket_type),
                 "boys": reservation.boys,
                 "girls": reservation.girls,
                 "total_price": reservation.total_price,
-                "attendees": [row["full_name"] for row in attendees],
+                "attendees": attendee_names,
             }
         )
     return {"items": items}
 
 
 @app.post("/api/book_with_payment")
-async def book_with_payment(request: Request) -> Dict[str, Any]:
+async def book_with_payment(request: Request, background: BackgroundTasks) -> Dict[str, Any]:
     _maybe_run_upload_cleanup()
     form = await request.form()
     upload_values = [value for _, value in form.multi_items() if _is_upload_file(value)]
@@ -574,9 +784,10 @@ async def book_with_payment(request: Request) -> Dict[str, Any]:
         if not _is_upload_file(payment_file):
             raise HTTPException(status_code=400, detail="Payment proof file is required.")
 
-        user = db.get_user(tg_id)
+        user = await run_in_threadpool(db.get_user, tg_id)
         if not user:
             raise HTTPException(status_code=404, detail="User profile not found. Run /start in bot.")
+        _rate_limit("booking", tg_id, BOOKING_RATE_LIMIT_PER_MINUTE)
 
         try:
             attendees_list = json.loads(attendees)
@@ -585,10 +796,10 @@ async def book_with_payment(request: Request) -> Dict[str, Any]:
         if not isinstance(attendees_list, list):
             raise HTTPException(status_code=400, detail="attendees must be a list.")
         normalized_attendees = [str(x).strip() for x in attendees_list]
-        if any(len(name.split()) < 2 for name in normalized_attendees):
+        if any(_WHITESPACE_RE.search(name) is None for name in normalized_attendees):
             raise HTTPException(status_code=400, detail='Each attendee must be in format "Name Surname".')
 
-        event = db.get_event(event_id)
+        event = await run_in_threadpool(db.get_event, event_id)
         if not event:
             raise HTTPException(status_code=404, detail="Event not found")
 
@@ -626,7 +837,8 @@ async def book_with_payment(request: Request) -> Dict[str, Any]:
         )
 
         try:
-            reservation = db.create_pending_reservation(
+            reservation = await run_in_threadpool(
+                db.create_pending_reservation,
                 user_id=user.id,
                 event_id=int(event_id),
                 boys=int(boys),
@@ -640,8 +852,8 @@ async def book_with_payment(request: Request) -> Dict[str, Any]:
         except ValueError as exc:
             raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-        _notify_admins_pending_from_miniapp(reservation)
-        _notify_user_pending_from_miniapp(reservation, tg_id)
+        background.add_task(_notify_admins_pending_from_miniapp, reservation)
+        background.add_task(_notify_user_pending_from_miniapp, reservation, tg_id)
         return {
             "ok": True,
             "code": reservation.code,
@@ -656,9 +868,9 @@ async def book_with_payment(request: Request) -> Dict[str, Any]:
 
 
 @app.post("/api/quote")
-def quote(payload: QuoteRequest) -> Dict[str, Any]:
+def quote(payload: QuoteRequest) -> Response:
     try:
-        return db.quote_booking(payload.event_id, payload.boys, payload.girls)
+        return _json_response(db.quote_booking(payload.event_id, payload.boys, payload.girls))
     except ValueError as exc:
         text = str(exc)
         if text == "Event not found":
@@ -669,9 +881,13 @@ def quote(payload: QuoteRequest) -> Dict[str, Any]:
 
 
 @app.get("/api/admin/bootstrap")
-def admin_bootstrap(tg_id: int) -> Dict[str, Any]:
+def admin_bootstrap(tg_id: int, request: Request) -> Response:
     _require_admin(tg_id)
-    return {"ok": True, "tg_id": tg_id}
+    etag = f'W/"admin-{tg_id}-v1"'
+    headers = {"ETag": etag, "Cache-Control": f"private, max-age={ADMIN_BOOTSTRAP_MAX_AGE_SECONDS}"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=_encode_json({"ok": True, "tg_id": tg_id}), media_type="application/json", headers=headers)
 
 
 @app.get("/api/admin/guests")
@@ -680,22 +896,41 @@ def admin_guests(
     sort_by: str = "newest",
     search: Optional[str] = None,
     limit: Optional[int] = None,
-) -> Dict[str, Any]:
+    after_id: Optional[int] = None,
+) -> Response:
     _require_admin(tg_id)
-    rows = db.list_guests(sort_by=sort_by, search=search, limit=limit)
-    return {"items": [_row_dict(r) for r in rows]}
+    if limit is None or limit > ADMIN_GUESTS_STREAM_THRESHOLD:
+        rows = db.iter_guests(sort_by=sort_by, search=search, limit=limit, after_id=after_id)
+        return StreamingResponse(_iter_json_items(rows), media_type="application/json")
+    rows = db.list_guests(sort_by=sort_by, search=search, limit=limit, after_id=after_id)
+    return _json_response({"items": [_row_dict(r) for r in rows]})
 
 
 @app.get("/api/admin/reservations")
-def admin_reservations(tg_id: int, search: Optional[str] = None, limit: int = 25) -> Dict[str, Any]:
+def admin_reservations(
+    tg_id: int,
+    search: Optional[str] = None,
+    limit: int = 25,
+    created_before: Optional[str] = None,
+    before_id: Optional[int] = None,
+) -> Response:
     _require_admin(tg_id)
-    rows = db.list_active_reservations(search=search, limit=limit)
-    return {"items": [_row_dict(r) for r in rows]}
+    rows = db.list_active_reservations(
+        search=search,
+        limit=limit,
+        created_before=created_before,
+        before_id=before_id,
+    )
+    return _json_response({"items": [_row_dict(r) for r in rows]})
 
 
 @app.get("/api/admin/events")
-def admin_events(tg_id: int) -> Dict[str, Any]:
+def admin_events(tg_id: int) -> Response:
     _require_admin(tg_id)
+    return Response(content=_cached_events_response("admin", _build_admin_events)[0], media_type="application/json")
+
+
+def _build_admin_events() -> Dict[str, Any]:
     items = []
     for event in db.list_events():
         payload = _event_payload(event)
@@ -722,13 +957,13 @@ def admin_events(tg_id: int) -> Dict[str, Any]:
 def admin_guest_add(payload: AdminGuestAddRequest) -> Dict[str, Any]:
     _require_admin(payload.tg_id)
     ok, message, reservation = db.admin_add_guest(
-        reservation_code=payload.reservation_code.strip(),
-        full_name=payload.full_name.strip(),
-        gender_raw=payload.gender.strip().lower(),
+        reservation_code=payload.reservation_code,
+        full_name=payload.full_name,
+        gender_raw=payload.gender,
     )
     if not ok:
         raise HTTPException(status_code=400, detail=message)
-    return {"ok": True, "message": message, "reservation": reservation.__dict__ if reservation else None}
+    return {"ok": True, "message": message, "reservation": _reservation_dict(reservation)}
 
 
 @app.post("/api/admin/guest/remove")
@@ -737,13 +972,13 @@ def admin_guest_remove(payload: AdminGuestRemoveRequest) -> Dict[str, Any]:
     ok, message, reservation = db.admin_remove_guest(payload.attendee_id)
     if not ok:
         raise HTTPException(status_code=400, detail=message)
-    return {"ok": True, "message": message, "reservation": reservation.__dict__ if reservation else None}
+    return {"ok": True, "message": message, "reservation": _reservation_dict(reservation)}
 
 
 @app.post("/api/admin/guest/rename")
 def admin_guest_rename(payload: AdminGuestRenameRequest) -> Dict[str, Any]:
     _require_admin(payload.tg_id)
-    ok, message = db.admin_rename_guest(payload.attendee_id, payload.full_name.strip())
+    ok, message = db.admin_rename_guest(payload.attendee_id, payload.full_name)
     if not ok:
         raise HTTPException(status_code=400, detail=message)
     return {"ok": True, "message": message}
@@ -755,13 +990,13 @@ def admin_guest_add_by_event(payload: AdminGuestAddByEventRequest) -> Dict[str,
     ok, message, reservation = db.admin_add_guest_by_event(
         admin_tg_id=payload.tg_id,
         event_id=payload.event_id,
-        name=payload.name.strip(),
-        surname=payload.surname.strip(),
-        gender_raw=payload.gender.strip().lower(),
+        name=payload.name,
+        surname=payload.surname,
+        gender_raw=payload.gender,
     )
     if not ok:
         raise HTTPException(status_code=400, detail=message)
-    return {"ok": True, "message": message, "reservation": reservation.__dict__ if reservation else None}
+    return {"ok": True, "message": message, "reservation": _reservation_dict(reservation)}
 
 
 @app.post("/api/admin/guest/remove_by_name")
@@ -769,12 +1004,12 @@ def admin_guest_remove_by_name(payload: AdminGuestRemoveByNameRequest) -> Dict[s
     _require_admin(payload.tg_id)
     ok, message, reservation = db.admin_remove_guest_by_name(
         event_id=payload.event_id,
-        name=payload.name.strip(),
-        surname=payload.surname.strip(),
+        name=payload.name,
+        surname=payload.surname,
     )
     if not ok:
         raise HTTPException(status_code=400, detail=message)
-    return {"ok": True, "message": message, "reservation": reservation.__dict__ if reservation else None}
+    return {"ok": True, "message": message, "reservation": _reservation_dict(reservation)}
 
 
 @app.post("/api/admin/guest/import_xlsx")
@@ -784,43 +1019,60 @@ async def admin_guest_import_xlsx(
     file: UploadFile = File(...),
 ) -> Dict[str, Any]:
     _require_admin(tg_id)
+    _rate_limit("import", tg_id, IMPORT_RATE_LIMIT_PER_MINUTE)
     if not file.filename or not file.filename.lower().endswith(".xlsx"):
         raise HTTPException(status_code=400, detail="Upload .xlsx file.")
 
-    raw = await file.read()
+    size = file.size
+    if size is None:
+        size = file.file.seek(0, os.SEEK_END)
+    if size > MAX_XLSX_IMPORT_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File is too large. Max allowed size is {XLSX_IMPORT_MAX_MB:.1f} MB.",
+        )
+    file.file.seek(0)
+    return await asyncio.get_running_loop().run_in_executor(
+        _XLSX_EXECUTOR, _import_guest_xlsx, tg_id, event_id, file.file
+    )
+
+
+def _import_guest_xlsx(tg_id: int, event_id: int, handle: BinaryIO) -> Dict[str, Any]:
     try:
-        workbook = load_workbook(filename=BytesIO(raw), data_only=True)
+        workbook = load_workbook(filename=handle, read_only=True, data_only=True)
     except Exception as exc:
         raise HTTPException(status_code=400, detail=f"Failed to parse xlsx: {exc}") from exc
 
-    sheet = workbook.active
     added = 0
     skipped = 0
     errors = []
 
-    for row_index, row in enumerate(sheet.iter_rows(values_only=True), start=1):
-        parsed = _parse_guest_row(row, row_index)
-        if parsed["skip"]:
-            if parsed["reason"] in {"empty", "header"}:
+    guest_rows = []
+    guest_row_indexes = []
+    try:
+        for row_index, row in enumerate(workbook.active.iter_rows(max_col=2, values_only=True), start=1):
+            parsed = _parse_guest_row(row, row_index)
+            if parsed["skip"]:
+                if parsed["reason"] in {"empty", "header"}:
+                    continue
+                skipped += 1
+                errors.append(f"Row {row_index}: invalid name/surname values.")
                 continue
-            skipped += 1
-            errors.append(f"Row {row_index}: invalid name/surname values.")
-            continue
-
-        value_name = parsed["name"]
-        value_surname = parsed["surname"]
+            guest_rows.append((parsed["name"], parsed["surname"]))
+            guest_row_indexes.append(row_index)
+    finally:
+        workbook.close()
 
-        ok, message, _reservation = db.admin_import_guest_by_event(
-            admin_tg_id=tg_id,
-            event_id=event_id,
-            name=value_name,
-            surname=value_surname,
-        )
-        if ok:
-            added += 1
-        else:
-            skipped += 1
-            errors.append(f"Row {row_index}: {message}")
+    ok, message, imported = db.admin_import_guests_by_event(
+        admin_tg_id=tg_id,
+        event_id=event_id,
+        rows=guest_rows,
+    )
+    if ok:
+        added += imported
+    else:
+        skipped += len(guest_rows)
+        errors.extend(f"Row {row_index}: {message}" for row_index in guest_row_indexes)
 
     return {
         "ok": True,
@@ -830,27 +1082,75 @@ async def admin_guest_import_xlsx(
     }
 
 
-@app.get("/api/admin/guest/export_xlsx")
-def admin_guest_export_xlsx(tg_id: int) -> StreamingResponse:
-    _require_admin(tg_id)
-    workbook = Workbook()
-    sheet = workbook.active
-    sheet.title = "Guests"
+def _iter_spooled_file(handle: BinaryIO) -> Iterator[bytes]:
+    try:
+        while True:
+            chunk = handle.read(XLSX_STREAM_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        handle.close()
+
+
+def _build_guest_xlsx() -> BinaryIO:
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Guests")
     sheet.append(["Name", "Surname"])
-    for first, last in db.list_guest_name_pairs():
+    for first, last in db.iter_guest_name_pairs():
         sheet.append([first, last])
 
-    output = BytesIO()
-    workbook.save(output)
+    output = tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_MAX_BYTES)
+    try:
+        workbook.save(output)
+    except Exception:
+        output.close()
+        raise
     output.seek(0)
+    return output
+
+
+@app.get("/api/admin/guest/export_xlsx")
+async def admin_guest_export_xlsx(tg_id: int) -> StreamingResponse:
+    _require_admin(tg_id)
+    output = await asyncio.get_running_loop().run_in_executor(_XLSX_EXECUTOR, _build_guest_xlsx)
     headers = {"Content-Disposition": 'attachment; filename="guests_export.xlsx"'}
     return StreamingResponse(
-        output,
+        _iter_spooled_file(output),
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         headers=headers,
     )
 
 
+def _iter_csv_chunks(rows: Iterable[Tuple]) -> Iterator[str]:
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EVENT_EXPORT_CSV_HEADERS)
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= CSV_STREAM_ROWS_PER_CHUNK:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue()
+
+
+@app.get("/api/admin/event/{event_id}/export.csv")
+def admin_event_export_csv(event_id: int, tg_id: int) -> StreamingResponse:
+    _require_admin(tg_id)
+    if db.get_event(event_id) is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+    headers = {"Content-Disposition": f'attachment; filename="event_{event_id}_export.csv"'}
+    return StreamingResponse(
+        _iter_csv_chunks(db.export_event_csv(event_id)),
+        media_type="text/csv; charset=utf-8",
+        headers=headers,
+    )
+
+
 @app.post("/api/admin/event/update")
 def admin_event_update(payload: AdminEventUpdateRequest) -> Dict[str, Any]:
     _require_admin(payload.tg_id)
@@ -858,7 +1158,7 @@ def admin_event_update(payload: AdminEventUpdateRequest) -> Dict[str, Any]:
     if not ok:
         raise HTTPException(status_code=400, detail=message)
     event = db.get_event(payload.event_id)
-    return {"ok": True, "message": message, "event": event.__dict__ if event else None}
+    return {"ok": True, "message": message, "event": _event_dict(event)}
 
 
 @app.post("/api/admin/event/delete")
@@ -899,12 +1199,12 @@ def admin_event_create_simple(payload: AdminEventCreateSimpleRequest) -> Dict[st
         except ValueError as exc:
             raise HTTPException(status_code=400, detail="Invalid datetime format. Use YYYY-MM-DD HH:MM") from exc
     else:
-        default_dt = (datetime.now(ZoneInfo("Europe/Budapest")) + timedelta(days=7)).replace(
+        default_dt = (datetime.now(BUDAPEST_TZ) + timedelta(days=7)).replace(
             minute=0,
             second=0,
             microsecond=0,
         )
-        event_datetime = default_dt.strftime("%Y-%m-%d %H:%M")
+        event_datetime = default_dt.strftime(EVENT_DT_FORMAT)
 
     event_id = db.create_event(
         title=title,
@@ -936,7 +1236,7 @@ def admin_event_create_simple(payload: AdminEventCreateSimpleRequest) -> Dict[st
     return {
         "ok": True,
         "message": "Event created.",
-        "event": event.__dict__ if event else None,
+        "event": _event_dict(event),
     }
 
 
@@ -946,4 +1246,5 @@ if __name__ == "__main__":
     host = os.getenv("MINI_APP_HOST", "0.0.0.0")
     port = int(os.getenv("PORT") or os.getenv("MINI_APP_PORT", "8080"))
     reload_enabled = os.getenv("MINI_APP_RELOAD", "0") == "1"
-    uvicorn.run("ticketbot.miniapp_server:app", host=host, port=port, reload=reload_enabled)
+    workers = 1 if reload_enabled else _env_positive_int("WEB_CONCURRENCY", 1)
+    uvicorn.run("ticketbot.miniapp_server:app", host=host, port=port, reload=reload_enabled, workers=workers)
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Optional, Sequence
 
 
 @dataclass
@@ -31,6 +31,10 @@ class Event:
     payment3_title: str = ""
     payment3_url: str = ""
 
+    @classmethod
+    def from_row(cls, row: Sequence[Any]) -> "Event":
+        return cls(*row)
+
 
 @dataclass
 class Reservation:
@@ -61,6 +65,10 @@ class Reservation:
     reviewed_by_tg_id: Optional[int]
     hold_applied: int
 
+    @classmethod
+    def from_row(cls, row: Sequence[Any]) -> "Reservation":
+        return cls(*row)
+
 
 @dataclass
 class User:
@@ -71,3 +79,7 @@ class User:
     phone: str
     blocked: int
     blocked_reason: Optional[str]
+
+    @classmethod
+    def from_row(cls, row: Sequence[Any]) -> "User":
+        return cls(*row)
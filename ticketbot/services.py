@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from typing import Iterator, List, Optional, Tuple
 
 from ticketbot.database import Database
 from ticketbot.models import Event, Reservation, User
@@ -140,7 +140,7 @@ class AdminService:
     def list_blocked_users(self):
         return self.db.list_blocked_users()
 
-    def export_event_csv(self, event_id: int) -> List[List[str]]:
+    def export_event_csv(self, event_id: int) -> Iterator[Tuple]:
         return self.db.export_event_csv(event_id)
 
     def set_event_price(self, event_id: int, price_field: str, value: float) -> bool:
@@ -167,14 +167,26 @@ class AdminService:
         sort_by: str = "newest",
         search: Optional[str] = None,
         limit: int = 25,
+        after_id: Optional[int] = None,
     ):
-        return self.db.list_guests(sort_by=sort_by, search=search, limit=limit)
+        return self.db.list_guests(sort_by=sort_by, search=search, limit=limit, after_id=after_id)
 
     def get_guest(self, attendee_id: int):
         return self.db.get_guest(attendee_id)
 
-    def list_active_reservations(self, search: Optional[str] = None, limit: int = 12):
-        return self.db.list_active_reservations(search=search, limit=limit)
+    def list_active_reservations(
+        self,
+        search: Optional[str] = None,
+        limit: int = 12,
+        created_before: Optional[str] = None,
+        before_id: Optional[int] = None,
+    ):
+        return self.db.list_active_reservations(
+            search=search,
+            limit=limit,
+            created_before=created_before,
+            before_id=before_id,
+        )
 
     def add_guest(self, reservation_code: str, full_name: str, gender: str) -> ActionResult:
         ok, message, reservation = self.db.admin_add_guest(reservation_code, full_name, gender)